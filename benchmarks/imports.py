@@ -0,0 +1,83 @@
+"""What loading the modules of the integration adds to Home Assistant boot.
+
+Run from the root of the repository with ``python -m benchmarks.imports``.
+Every module is imported in a fresh interpreter which has already imported
+what Home Assistant itself loads before setting up an integration, so only
+the cost of the integration and the packages it pulls in is measured.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+
+MODULES = (
+    "custom_components.animeflv",
+    "custom_components.animeflv.config_flow",
+    "custom_components.animeflv.sensor",
+    "custom_components.animeflv.image",
+    "custom_components.animeflv.calendar",
+)
+
+# loaded by Home Assistant before any config entry is set up
+PRELOADED = (
+    "homeassistant.core",
+    "homeassistant.config_entries",
+    "homeassistant.components.http",
+    "homeassistant.helpers.aiohttp_client",
+    "homeassistant.helpers.entity_platform",
+    "homeassistant.helpers.storage",
+    "homeassistant.helpers.update_coordinator",
+)
+
+# run by the child interpreter, prints the measure as json
+PROBE = """
+import importlib, json, sys, time
+for name in {preloaded!r}:
+    importlib.import_module(name)
+before = set(sys.modules)
+start = time.perf_counter()
+try:
+    importlib.import_module({module!r})
+    error = None
+except Exception as exception:
+    error = repr(exception)
+seconds = time.perf_counter() - start
+packages = sorted({{
+    name.split(".")[0] for name in set(sys.modules) - before
+}} - {{"custom_components", "homeassistant"}})
+print(json.dumps({{"seconds": seconds, "packages": packages, "error": error}}))
+"""
+
+
+def measure(module: str) -> dict:
+    """Import module in a new interpreter, return how long it took."""
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(preloaded=PRELOADED, module=module)],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main(modules: list[str], rounds: int) -> None:
+    """Print the best import time of every module, and what it pulled in."""
+    print(f"{'module':<42}{'ms':>8}  new packages")  # noqa: T201
+    for module in modules:
+        results = [measure(module) for _ in range(rounds)]
+        best = min(result["seconds"] for result in results)
+        result = results[0]
+        packages = ", ".join(result["packages"]) or "-"
+        if result["error"] is not None:
+            packages = f"failed: {result['error']}"
+        print(f"{module:<42}{best * 1000:>8.1f}  {packages}")  # noqa: T201
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--modules", nargs="+", default=list(MODULES))
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    main(args.modules, args.rounds)
@@ -0,0 +1,91 @@
+"""Reading the script variables of a detail page, before and after jsvars.
+
+Run from the root of the repository with ``python -m benchmarks.jsvars``.
+Random detail pages are first checked to give the same values with both
+implementations, then both are timed on pages of growing series.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import timeit
+
+from custom_components.animeflv import jsvars
+
+from . import pages
+
+ROUNDS = 200
+EPISODES = (12, 500, 3000)
+
+
+def legacy_script(html: str, inEmission: bool) -> tuple[int, int, str | None]:
+    """Return episodes count, last seen and next episode as parse_detail did."""
+    jsSentence = "var episodes = "
+    init = html.find(jsSentence, 0)
+    semiColon = html.find(";", init)
+    line = html[init + len(jsSentence) + 1 : semiColon - 1]
+    parts = line.split(",")
+    episodesCount = int(len(parts) / 2)
+
+    jsSentence = "var last_seen = "
+    init = html.find(jsSentence, 0)
+    semiColon = html.find(";", init)
+    lastSeen = int(html[init + len(jsSentence) : semiColon])
+
+    nextEpisode = None
+    if inEmission:
+        jsSentence = "var anime_info = "
+        init = html.find(jsSentence, 0)
+        semiColon = html.find(";", init)
+        line = html[init + len(jsSentence) + 1 : semiColon - 1]
+        parts = line.split(',"')
+        if len(parts) >= 4:
+            nextEpisode = parts[3].replace('"','')
+    return episodesCount, lastSeen, nextEpisode
+
+
+def extracted_script(html: str, inEmission: bool) -> tuple[int, int, str | None]:
+    """Return the same values as legacy_script, read by jsvars."""
+    script = jsvars.parse_script(html)
+    nextEpisode = script.next_episode if inEmission else None
+    return script.episodes_count, script.last_seen, nextEpisode
+
+
+def fuzz(count: int, seed: int) -> None:
+    """Compare both implementations on count random detail pages."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        index = rng.randrange(10000)
+        episodes = rng.choice((0, 1, 2, rng.randrange(3000)))
+        last_seen = rng.randrange(episodes + 1)
+        airing = rng.random() < 0.5
+        html = pages.detail_page(index, episodes, last_seen, airing)
+        expected = legacy_script(html, airing)
+        got = extracted_script(html, airing)
+        assert got == expected, f"{index}/{episodes}/{last_seen}: {got} != {expected}"
+        script = jsvars.parse_script(html)
+        assert script.last_episode == (episodes or None), script
+    print(f"{count} random pages read the same")  # noqa: T201
+
+
+def run() -> None:
+    """Print the average time to read the variables of a detail page."""
+    print(f"{'episodes':>10}{'legacy ms':>12}{'jsvars ms':>12}")  # noqa: T201
+    for episodes in EPISODES:
+        html = pages.detail_page(1, episodes, episodes // 2, airing=True)
+        legacy_ms = timeit.timeit(
+            lambda: legacy_script(html, True), number=ROUNDS
+        ) / ROUNDS * 1000
+        jsvars_ms = timeit.timeit(
+            lambda: extracted_script(html, True), number=ROUNDS
+        ) / ROUNDS * 1000
+        print(f"{episodes:>10}{legacy_ms:>12.4f}{jsvars_ms:>12.4f}")  # noqa: T201
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fuzz", type=int, default=500, help="random pages to compare")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    fuzz(args.fuzz, args.seed)
+    run()
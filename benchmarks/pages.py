@@ -0,0 +1,87 @@
+"""AnimeFLV pages rendered from the HTML fixtures, for synthetic libraries."""
+from __future__ import annotations
+
+import datetime
+from functools import cache
+from pathlib import Path
+from string import Template
+
+FIXTURES = Path(__file__).parent / "fixtures"
+PAGE_SIZE = 20
+
+MENU = "".join(f'<li><a href="/browse?genre[]=g{n}">Genero {n}</a></li>' for n in range(40))
+
+
+@cache
+def _template(name: str) -> Template:
+    return Template((FIXTURES / f"{name}.html").read_text(encoding="utf-8"))
+
+
+def slug(index: int) -> str:
+    """Return the slug of the synthetic anime number index."""
+    return f"anime-de-prueba-{index}"
+
+
+def title(index: int) -> str:
+    """Return the title of the synthetic anime number index."""
+    return f"Anime de prueba {index}"
+
+
+def total_pages(total: int) -> int:
+    """Return the number of followed list pages of a library of total animes."""
+    return max(1, -(-total // PAGE_SIZE))
+
+
+def sign_in_page(profile: str) -> str:
+    """Return the page shown after logging in."""
+    return _template("sign_in").substitute(menu=MENU, profile=profile)
+
+
+def followed_page(profile: str, page: int, total: int) -> str:
+    """Return page number page of the followed list of a library of total animes."""
+    items = "".join(
+        _template("siguiendo_item").substitute(slug=slug(index), id=index, title=title(index))
+        for index in range((page - 1) * PAGE_SIZE, min(page * PAGE_SIZE, total))
+    )
+    pages = "".join(
+        f'<li><a href="/perfil/{profile}/siguiendo?page={n}">{n}</a></li>'
+        for n in range(1, total_pages(total) + 1)
+    )
+    return _template("siguiendo").substitute(menu=MENU, items=items, pages=pages)
+
+
+def detail_page(index: int, episodes: int, last_seen: int, airing: bool) -> str:
+    """Return the detail page of the synthetic anime number index."""
+    anime_info = f'["{index}","{title(index)}","{slug(index)}"'
+    if airing:
+        next_episode = datetime.date.today() + datetime.timedelta(days=index % 7)
+        anime_info += f',"{next_episode.isoformat()}"'
+    anime_info += "]"
+    return _template("anime").substitute(
+        menu=MENU,
+        id=index,
+        title=title(index),
+        status="En emision" if airing else "Finalizado",
+        description=f"Una historia larga sobre {title(index)}. " * 20,
+        genres="".join(f'<a href="/browse?genres[]=g{n}">Genero {n}</a>' for n in range(5)),
+        anime_info=anime_info,
+        episodes="[" + ",".join(f"[{n},{episode_id(index, n)}]" for n in range(episodes, 0, -1)) + "]",
+        last_seen=last_seen,
+    )
+
+
+def episode_id(index: int, number: int) -> int:
+    """Return the id of episode number of the synthetic anime number index."""
+    return index * 1000 + number
+
+
+def library_anime(index: int) -> tuple[int, int, bool]:
+    """Return episodes, last seen and airing of the synthetic anime number index."""
+    airing = index % 4 == 0
+    episodes = 12 + (index * 7) % 300
+    return episodes, (index * 5) % (episodes + 1), airing
+
+
+def cover(index: int) -> bytes:
+    """Return the cover of the synthetic anime number index, not a real image."""
+    return b"\xff\xd8\xff\xe0" + f"cover {index} ".encode() * 2000 + b"\xff\xd9"
@@ -0,0 +1,43 @@
+"""Per page parse time of every parser backend installed.
+
+Run from the root of the repository with ``python -m benchmarks.parsers``.
+"""
+from __future__ import annotations
+
+import timeit
+
+from custom_components.animeflv import parser
+
+from . import pages
+
+ROUNDS = 20
+# the best of REPEATS runs of ROUNDS parses is kept, the others are noise
+REPEATS = 5
+
+
+def best_ms(parse) -> float:
+    """Return the best time of a call to parse, in milliseconds."""
+    return min(timeit.repeat(parse, number=ROUNDS, repeat=REPEATS)) / ROUNDS * 1000
+
+
+def run() -> None:
+    """Print the parse time of a followed page and a detail page."""
+    followed = pages.followed_page("usuario", 1, pages.PAGE_SIZE * 5)
+    detail = pages.detail_page(1, 500, 120, airing=True)
+    print(f"{'backend':<12}{'followed ms':>14}{'detail ms':>14}")  # noqa: T201
+    for name in parser.available_backends():
+        backend = parser.get_backend(name)
+        followed_ms = best_ms(lambda: parser.parse_followed_page(followed, backend))
+        detail_ms = best_ms(lambda: parser.parse_detail(detail, backend))
+        print(f"{name:<12}{followed_ms:>14.3f}{detail_ms:>14.3f}")  # noqa: T201
+
+    # the full html.parser tree the integration used to build for every page,
+    # with the same extraction as the backends
+    backend = parser.SoupBackend(strain=False)
+    followed_ms = best_ms(lambda: parser.parse_followed_page(followed, backend))
+    detail_ms = best_ms(lambda: parser.parse_detail(detail, backend))
+    print(f"{'bs4 (full)':<12}{followed_ms:>14.3f}{detail_ms:>14.3f}")  # noqa: T201
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,131 @@
+"""Cost of a full refresh against the local stand-in server.
+
+Run from the root of the repository with ``python -m benchmarks.refresh``.
+No network access is needed, the fixtures are served from localhost.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.animeflv import api
+from custom_components.animeflv.cache import AnimeFlvDetailCache
+from custom_components.animeflv.const import DEFAULT_MAX_CONCURRENCY
+from custom_components.animeflv.ratelimit import TokenBucket
+
+from .server import StandInServer
+
+SIZES = (10, 100, 1000)
+# seconds between two ticks of the loop lag probe
+PROBE_INTERVAL = 0.005
+
+
+class LoopLagProbe:
+    """Measure the longest time the event loop could not run a callback."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.longest = 0.0
+        self._task: asyncio.Task | None = None
+
+    def __enter__(self) -> LoopLagProbe:
+        """Start probing the running loop."""
+        self._task = asyncio.get_running_loop().create_task(self._async_probe())
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Stop probing."""
+        self._task.cancel()
+
+    async def _async_probe(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(PROBE_INTERVAL)
+            self.longest = max(
+                self.longest, time.perf_counter() - start - PROBE_INTERVAL
+            )
+
+
+async def run_size(
+    hass: HomeAssistant,
+    size: int,
+    concurrency: int,
+    latency: float,
+) -> list[dict]:
+    """Run a cold refresh of a library of size animes, then revalidate it all.
+
+    For the second refresh every cached detail is made due while the site
+    has not changed, so every request is answered with 304 Not Modified.
+    """
+    server = StandInServer(size, latency)
+    await server.async_start()
+    cache = AnimeFlvDetailCache(hass, f"benchmark.{size}")
+    client = api.AnimeFlvApiClient(
+        username="usuario@example.com",
+        password="secreto",
+        hass=hass,
+        max_concurrency=concurrency,
+        cache=cache.for_account("benchmark"),
+        host=server.host,
+        rate_limiter=TokenBucket(rate=0),
+        request_budget=None,
+    )
+    results = []
+    try:
+        for run in ("cold", "revalidate"):
+            server.stats.reset()
+            start = time.perf_counter()
+            with LoopLagProbe() as probe:
+                data = await client.async_get_data()
+            wall = time.perf_counter() - start
+            assert len(data) == size, f"expected {size} animes, got {len(data)}"
+            results.append({
+                "size": size,
+                "run": run,
+                "wall": wall,
+                "requests": server.stats.requests,
+                "bytes": server.stats.bytes,
+                "parse": client.metrics.phases.get("parse", 0.0),
+                "lag": probe.longest,
+            })
+            for seen in cache._seen.values():  # noqa: SLF001
+                for entry in seen.values():
+                    entry["due"] = 0
+    finally:
+        await client.async_close()
+        await server.async_stop()
+    return results
+
+
+async def main(sizes: list[int], concurrency: int, latency: float) -> None:
+    """Print the cost of a refresh for every library size."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        try:
+            print(  # noqa: T201
+                f"{'animes':>8}{'run':>12}{'wall s':>10}{'requests':>10}{'kB':>10}{'parse s':>10}{'lag ms':>10}"
+            )
+            for size in sizes:
+                for result in await run_size(hass, size, concurrency, latency):
+                    print(  # noqa: T201
+                        f"{result['size']:>8}{result['run']:>12}{result['wall']:>10.2f}"
+                        f"{result['requests']:>10}{result['bytes'] / 1024:>10.0f}"
+                        f"{result['parse']:>10.2f}{result['lag'] * 1000:>10.1f}"
+                    )
+        finally:
+            await hass.async_stop(force=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY)
+    parser.add_argument(
+        "--latency", type=float, default=0, help="seconds added to every response"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.concurrency, args.latency))
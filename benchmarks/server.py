@@ -0,0 +1,140 @@
+"""Local stand-in for the AnimeFLV site, serving the fixtures."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import hashlib
+
+from aiohttp import web
+
+from custom_components.animeflv.const import MARK_SEEN_PATH
+
+from . import pages
+
+PROFILE = "usuario"
+SESSION_COOKIE = "login_token"
+
+
+@dataclass
+class ServerStats:
+    """What the server has seen since the last reset."""
+
+    requests: int = 0
+    bytes: int = 0
+    not_modified: int = 0
+
+    def reset(self) -> None:
+        """Start counting again."""
+        self.requests = 0
+        self.bytes = 0
+        self.not_modified = 0
+
+
+class StandInServer:
+    """Serve a synthetic library of size animes on localhost.
+
+    Every response is delayed by latency seconds, to mimic the real site,
+    and answers conditional requests like Rack::ETag does.
+    """
+
+    def __init__(self, size: int, latency: float = 0) -> None:
+        """Initialize."""
+        self.size = size
+        self.latency = latency
+        self.stats = ServerStats()
+        # anime number -> last episode marked seen through MARK_SEEN_PATH
+        self.seen: dict[int, int] = {}
+        self._runner: web.AppRunner | None = None
+        self.host = ""
+
+    async def async_start(self) -> None:
+        """Start listening on a free port."""
+        app = web.Application(middlewares=[self._count])
+        app.router.add_get("/auth/sign_in", self._sign_in_form)
+        app.router.add_post("/auth/sign_in", self._sign_in)
+        app.router.add_get("/auth/sign_out", self._sign_out)
+        app.router.add_get("/perfil/{profile}/siguiendo", self._followed)
+        app.router.add_get("/anime/{slug}", self._detail)
+        app.router.add_post(MARK_SEEN_PATH, self._mark_seen)
+        app.router.add_get("/uploads/animes/covers/{index}.jpg", self._cover)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # noqa: SLF001
+        # a name, aiohttp does not keep cookies set by an IP address
+        self.host = f"http://localhost:{port}"
+
+    async def async_stop(self) -> None:
+        """Stop the server."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    @web.middleware
+    async def _count(self, request: web.Request, handler) -> web.StreamResponse:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        try:
+            response = await handler(request)
+        except web.HTTPException as exception:
+            response = exception
+        self.stats.requests += 1
+        if response.status == 200 and isinstance(response, web.Response) and response.body:
+            etag = f'W/"{hashlib.md5(response.body).hexdigest()}"'  # noqa: S324
+            if request.headers.get("If-None-Match") == etag:
+                self.stats.not_modified += 1
+                return web.Response(status=304, headers={"ETag": etag})
+            response.headers["ETag"] = etag
+        if isinstance(response, web.Response) and response.body is not None:
+            self.stats.bytes += len(response.body)
+        return response
+
+    async def _sign_in_form(self, request: web.Request) -> web.Response:
+        return web.Response(text="<form></form>", content_type="text/html")
+
+    async def _sign_in(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        if not form.get("email") or not form.get("password"):
+            return web.Response(status=401)
+        response = web.Response(text=pages.sign_in_page(PROFILE), content_type="text/html")
+        response.set_cookie(SESSION_COOKIE, "secreto")
+        return response
+
+    async def _sign_out(self, request: web.Request) -> web.Response:
+        response = web.Response(text="", content_type="text/html")
+        response.del_cookie(SESSION_COOKIE)
+        return response
+
+    async def _followed(self, request: web.Request) -> web.Response:
+        if SESSION_COOKIE not in request.cookies:
+            raise web.HTTPFound("/auth/sign_in")
+        page = int(request.query.get("page", 1))
+        return web.Response(
+            text=pages.followed_page(PROFILE, page, self.size),
+            content_type="text/html",
+        )
+
+    async def _detail(self, request: web.Request) -> web.Response:
+        index = int(request.match_info["slug"].rsplit("-", 1)[1])
+        if index >= self.size:
+            raise web.HTTPNotFound()
+        episodes, last_seen, airing = pages.library_anime(index)
+        last_seen = max(last_seen, self.seen.get(index, 0))
+        return web.Response(
+            text=pages.detail_page(index, episodes, last_seen, airing),
+            content_type="text/html",
+        )
+
+    async def _mark_seen(self, request: web.Request) -> web.Response:
+        if SESSION_COOKIE not in request.cookies:
+            raise web.HTTPFound("/auth/sign_in")
+        form = await request.post()
+        index, number = divmod(int(form["id"]), 1000)
+        self.seen[index] = max(self.seen.get(index, 0), number)
+        return web.json_response({"success": True})
+
+    async def _cover(self, request: web.Request) -> web.Response:
+        index = int(request.match_info["index"])
+        if index >= self.size:
+            raise web.HTTPNotFound()
+        return web.Response(body=pages.cover(index), content_type="image/jpeg")
@@ -8,13 +8,26 @@ from __future__ import annotations
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME, Platform
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
 
-from .api import AnimeFlvApiClient
-from .const import DOMAIN
+from .const import (
+    CONF_MAX_CONCURRENCY,
+    CONF_PROFILE,
+    CONF_REQUEST_BUDGET,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_REQUEST_BUDGET,
+    DOMAIN,
+    STORAGE_VERSION,
+)
 from .coordinator import AnimeFlvDataUpdateCoordinator
+from .covers import async_get_cover_store
+from .pool import async_get_client_pool
+from .services import async_setup_services
 
 PLATFORMS: list[Platform] = [
     Platform.SENSOR,
+    Platform.IMAGE,
+    Platform.CALENDAR,
     #Platform.BINARY_SENSOR,
     #Platform.SWITCH,
 ]
@@ -24,18 +37,43 @@ PLATFORMS: list[Platform] = [
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up this integration using UI."""
     hass.data.setdefault(DOMAIN, {})
+    pool = async_get_client_pool(hass)
+    client = await pool.async_acquire(
+        username=entry.data[CONF_USERNAME],
+        password=entry.data[CONF_PASSWORD],
+        max_concurrency=entry.options.get(
+            CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY
+        ),
+        request_budget=entry.options.get(
+            CONF_REQUEST_BUDGET, DEFAULT_REQUEST_BUDGET
+        ),
+    )
     hass.data[DOMAIN][entry.entry_id] = coordinator = AnimeFlvDataUpdateCoordinator(
         hass=hass,
-        client=AnimeFlvApiClient(
-            username=entry.data[CONF_USERNAME],
-            password=entry.data[CONF_PASSWORD],
-            hass=hass)
-        )
+        client=client,
+        profile=entry.options.get(CONF_PROFILE, False),
+        snapshot_store=_snapshot_store(hass, entry),
+    )
 
-    # https://developers.home-assistant.io/docs/integration_fetching_data#coordinated-single-api-poll-for-data-for-all-entities
-    await coordinator.async_config_entry_first_refresh()
+    # the entities start from the animes known at the last shutdown
+    restored = await coordinator.async_restore()
+    if not restored:
+        # https://developers.home-assistant.io/docs/integration_fetching_data#coordinated-single-api-poll-for-data-for-all-entities
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except Exception:
+            hass.data[DOMAIN].pop(entry.entry_id)
+            await pool.async_release(client)
+            raise
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    if restored:
+        # after the platforms, so they see the animes followed meanwhile
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh"
+        )
+    async_setup_services(hass)
+    async_get_cover_store(hass)
     entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     return True
@@ -44,10 +82,22 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Handle removal of an entry."""
     if unloaded := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await async_get_client_pool(hass).async_release(coordinator.client)
     return unloaded
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the stored animes, session and cached progress of a removed entry."""
+    await _snapshot_store(hass, entry).async_remove()
+    await async_get_client_pool(hass).async_remove_account(entry.data[CONF_USERNAME])
+
+
+def _snapshot_store(hass: HomeAssistant, entry: ConfigEntry) -> Store:
+    """Return the store of the animes of the last refresh of entry."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.snapshot.{entry.entry_id}")
+
+
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload config entry."""
     await async_unload_entry(hass, entry)
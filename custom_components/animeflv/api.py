@@ -2,32 +2,46 @@
 from __future__ import annotations
 
 import asyncio
-import socket
+from collections.abc import Iterable
+import time
+
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .cache import AccountDetailCache
+from .const import (
+    ANIMEFLV_HOST,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_REQUEST_BUDGET,
+    LOGGER,
+    MARK_SEEN_PATH,
+    RETRY_ATTEMPTS,
+    RETRY_STATUSES,
+)
+from .exceptions import (  # noqa: F401
+    AnimeFlvApiClientAuthenticationError,
+    AnimeFlvApiClientCommunicationError,
+    AnimeFlvApiClientError,
+)
+from .metrics import RefreshMetrics
+from .models import FollowedAnime, FollowedAnimes
+from .ratelimit import TokenBucket, async_get_rate_limiter
+from .resilience import CircuitBreaker, async_get_circuit_breaker, backoff_delay
+from .parser import (
+    DETAIL_FIELDS,
+    FollowedPage,
+    parse_detail,
+    parse_episodes,
+    parse_followed_page,
+    parse_info,
+)
+from .transport import (
+    AnimeFlvResponse,
+    AnimeFlvTransport,
+    ChallengeFallbackTransport,
+)
+from .workers import ParseWorkerPool, async_get_parse_pool
 
-import aiohttp
-import async_timeout
-
-import datetime
-import cloudscraper
-from bs4 import BeautifulSoup
-
-
-class AnimeFlvApiClientError(Exception):
-    """Exception to indicate a general API error."""
-
-
-class AnimeFlvApiClientCommunicationError(
-    AnimeFlvApiClientError
-):
-    """Exception to indicate a communication error."""
-
-
-class AnimeFlvApiClientAuthenticationError(
-    AnimeFlvApiClientError
-):
-    """Exception to indicate an authentication error."""
-
-ANIMEFLV_HOST = "https://www3.animeflv.net"
 
 class AnimeFlvApiClient:
     """Sample API Client."""
@@ -36,44 +50,107 @@ class AnimeFlvApiClient:
         self,
         username: str,
         password: str,
-        hass
+        hass,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        cache: AccountDetailCache | None = None,
+        session_store: Store | None = None,
+        transport: AnimeFlvTransport | None = None,
+        host: str = ANIMEFLV_HOST,
+        rate_limiter: TokenBucket | None = None,
+        request_budget: int | None = DEFAULT_REQUEST_BUDGET,
+        parse_pool: ParseWorkerPool | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
     ) -> None:
         """Sample API Client."""
         self._username = username
         self._password = password
         self._hass = hass
-        self._session = None
+        self._host = host
+        self._transport = transport or ChallengeFallbackTransport(hass, host)
         self._profile = None
-        self._animes = {}
-
-
-    async def _getSession(self) -> any:
-        if self._session is None:
-
-            self._session = await self._hass.async_add_executor_job(cloudscraper.create_scraper,
-                {
-                        'browser': 'firefox',
-                        'platform': 'android',
-                        #'mobile': False
-                        'desktop' : False
-                }
-            )
-
-        return self._session
-
-    async def post(self, url, data) -> any:
-        session = await self._getSession()
-        response = await self._hass.async_add_executor_job(session.post, url, data)
-        return response
-
-    async def get(self, url) -> any:
-        session = await self._getSession()
-        response = await self._hass.async_add_executor_job(session.get, url)
-        return response
+        self._animes = FollowedAnimes()
+        self._max_concurrency = max(1, max_concurrency)
+        self._rate_limiter = rate_limiter or async_get_rate_limiter(hass, host)
+        self._request_budget = request_budget
+        self._parse_pool = parse_pool or async_get_parse_pool(hass)
+        self._cache = cache
+        self._session_store = session_store
+        self.metrics = RefreshMetrics()
+        self._breaker = circuit_breaker or async_get_circuit_breaker(hass, host)
+        # slugs whose detail page could not be refreshed in the last refresh
+        self.failed: set[str] = set()
+        # slugs whose stale detail page was left for the next refresh
+        self.deferred: set[str] = set()
+        # stale slugs the budget of the current refresh can afford, None for all
+        self._affordable: set[str] | None = None
+        # requests sent in the current refresh, retries included
+        self._sent = 0
+        # url -> validators and parsed content of the pages of the followed list
+        self._followed_pages: dict[str, tuple[dict, FollowedPage]] = {}
+        # slug -> when the detail page being read was requested, and the task
+        self._loading: dict[str, tuple[float, asyncio.Task]] = {}
+        # slug -> when episodes of the anime were last marked watched
+        self._marked: dict[str, float] = {}
+
+    def restore(self, animes: FollowedAnimes) -> None:
+        """Start from animes restored from disk, until the first refresh.
+
+        They are what the refresh falls back on when the followed list or a
+        detail page cannot be fetched.
+        """
+        if not self._animes:
+            self._animes = animes
+
+    @property
+    def cache(self) -> AccountDetailCache | None:
+        """Return the detail cache, if any."""
+        return self._cache
+
+    async def post(self, url, data) -> AnimeFlvResponse:
+        return await self._async_request("async_post", url, data)
+
+    async def get(self, url, headers: dict | None = None) -> AnimeFlvResponse:
+        return await self._async_request("async_get", url, headers)
+
+    async def async_get_binary(self, url: str) -> AnimeFlvResponse:
+        """Get an image or any other binary file."""
+        return await self._async_request("async_get_binary", url)
+
+    async def _async_request(self, method: str, url: str, *args) -> AnimeFlvResponse:
+        """Send a request, retrying with backoff on errors worth retrying.
+
+        The last retryable response is returned as is, a connection error
+        is raised once the attempts are exhausted.
+        """
+        for attempt in range(RETRY_ATTEMPTS):
+            trial = self._breaker.check()
+            try:
+                await self._rate_limiter.async_acquire()
+                self._sent += 1
+                try:
+                    response = await getattr(self._transport, method)(url, *args)
+                except AnimeFlvApiClientCommunicationError:
+                    self._breaker.record_failure()
+                    if attempt == RETRY_ATTEMPTS - 1:
+                        raise
+                else:
+                    self.metrics.add_response(response.size)
+                    if response.not_modified:
+                        self.metrics.not_modified += 1
+                    if response.status_code not in RETRY_STATUSES:
+                        self._breaker.record_success()
+                        return response
+                    self._breaker.record_failure()
+                    if attempt == RETRY_ATTEMPTS - 1:
+                        return response
+            finally:
+                if trial:
+                    self._breaker.end_trial()
+            self.metrics.retries += 1
+            await asyncio.sleep(backoff_delay(attempt))
 
     async def async_login(self) -> any:
-        await self.async_logout()
-        url = f"{ANIMEFLV_HOST}/auth/sign_in"
+        url = f"{self._host}/auth/sign_in"
         data = {
 			"email" : self._username,
 			"password" : self._password,
@@ -94,163 +171,497 @@ class AnimeFlvApiClient:
 
         profile = html[startProfile + 7: endProfile]
         self._profile = profile
+        await self._async_save_session()
         return profile
 
+    async def _async_ensure_login(self) -> None:
+        """Log in only when there is no session, restoring it from disk first."""
+        if self._profile is not None:
+            return
+        if self._session_store is not None:
+            stored = await self._session_store.async_load()
+            if stored and stored.get("username") == self._username:
+                self._transport.set_state(stored)
+                self._profile = stored["profile"]
+                return
+        await self.async_login()
+
+    async def _async_save_session(self) -> None:
+        """Persist the session cookies so a restart does not need a new login."""
+        if self._session_store is None:
+            return
+        await self._session_store.async_save(
+            {
+                "username": self._username,
+                "profile": self._profile,
+                **self._transport.get_state(),
+            }
+        )
+
+    @staticmethod
+    def _requires_login(response: AnimeFlvResponse) -> bool:
+        """Return True when a profile page bounced us to the sign in form."""
+        if response.status_code in (401, 403):
+            return True
+        return response.redirected and "/auth/sign_in" in response.url
+
     async def async_logout(self):
-        url = f"{ANIMEFLV_HOST}/auth/sign_out";
+        url = f"{self._host}/auth/sign_out";
         response = await self.get(url)
         #if response.status_code == 200:
         #    html = response.text
 
-
-
-
-    async def async_get_data(self) -> any:
-
-        await self.async_login()
-
-        profile = self._profile
-
-        page = 1
-        totalPages = 0
-        if profile != "":
-            animes = {}
-            while totalPages == 0 or page <= totalPages:
-                url = f"{ANIMEFLV_HOST}/perfil/{profile}/siguiendo??order=title&page={page}"
-                response = await self.get(url)
-                if response.status_code != 200:
-                    totalPages = -1
-                    break
-
-                html = response.text
-
-                soup = BeautifulSoup(html, 'html.parser')
-                if totalPages == 0:
-                    #read if more pages
-                    pagination = soup.find('ul', class_='pagination')
-                    pagesLi = pagination.find_all('li')
-                    totalPages = len(pagesLi) - 2
-
-                page += 1
-                ul = soup.find('ul', class_='ListAnimes')
-                lis = ul.find_all('li')
-
-                for li in lis:
-                    img = li.find('img')['src']
-
-                    a = li.find('div', class_="Title").find('strong').find('a')
-                    title = a.text.strip()
-                    href = a['href']
-                    data = {}
-                    data['title'] = title
-                    data['href'] = f"{ANIMEFLV_HOST}{href}"
-                    data['cover'] = f"{ANIMEFLV_HOST}{img}"
+    async def async_close(self) -> None:
+        """Close the sessions of the client."""
+        await self._transport.async_close()
+
+
+
+    async def async_get_data(self) -> FollowedAnimes:
+        """Get the followed animes, fetching their detail pages.
+
+        Once the first page of the followed list tells how many pages there
+        are, the remaining ones are fetched in parallel, and the detail pages
+        of every followed page start as soon as that page is parsed. All the
+        requests share the max_concurrency limit, and pages are parsed by the
+        parse workers while the next requests are sent.
+
+        Failures are contained: an anime whose detail page fails keeps its
+        last known detail, and the animes of a followed page that failed are
+        carried over from the previous refresh instead of being dropped.
+        """
+        metrics = self.metrics = RefreshMetrics()
+        self.failed = set()
+        self.deferred = set()
+        self._affordable = None
+        self._sent = 0
+        start = time.perf_counter()
+        with metrics.phase("auth"):
+            await self._async_ensure_login()
+
+        animes = FollowedAnimes()
+        if self._profile != "":
+            today = dt_util.now().date().isoformat()
+            semaphore = asyncio.Semaphore(self._max_concurrency)
+            pages: dict[int, dict[str, FollowedAnime]] = {}
+            details: list[asyncio.Task] = []
+            if self._cache is not None:
+                self._cache.reset_stats()
+
+            def add_page(page: int, followed: FollowedPage) -> None:
+                pages[page] = page_animes = {}
+                for title, href, img in followed.entries:
+                    data = FollowedAnime(
+                        title=title,
+                        href=f"{self._host}{href}",
+                        cover=f"{self._host}{img}",
+                    )
 
                     key = href.replace('/anime/','')
 
-                    animes[key] = data
-
-            today = datetime.datetime.now().strftime("%Y-%m-%d")
-
-            for key in animes.keys():
-                anime = animes[key]
-                url = anime['href']
-
-                #url = f"https://www3.animeflv.net{href}"
-                response = await self.get(url)
-                if response.status_code == 200:
-                    html = response.text
-
-                    soup = BeautifulSoup(html, 'html.parser')
-                    status = soup.find('aside', class_="SidebarA").find('p', class_="AnmStts").find('span').text
-
-                    inEmission = status == 'En emision'
-
-                    jsSentence = "var episodes = "
-                    init = html.find(jsSentence, 0)
-                    semiColon = html.find(";", init)
-
-                    line = html[init + len(jsSentence) + 1 : semiColon - 1]
-                    parts = line.split(",")
-                    episodesCount = int(len(parts) / 2)
-
-                    #last episode seen
-                    jsSentence = "var last_seen = "
-                    init = html.find(jsSentence, 0)
-                    semiColon = html.find(";", init)
-
-                    lastSeen = int(html[init + len(jsSentence) : semiColon])
-
-                    #episodeList > li:nth-child(6) > a
-                    nextToWatch = None
-                    if lastSeen < episodesCount:
-                        part = url.split("/")[-1]
-                        nextToWatch = ANIMEFLV_HOST + "/ver/" + part + "-" + str(lastSeen + 1)
-
-                    #in emission
-                    #var anime_info = ["3423","Dr. Stone: Stone Wars","dr-stone-stone-wars","2021-01-28"];
-
-                    nextEpisode = None
-                    if inEmission:
-                        jsSentence = "var anime_info = "
-                        init = html.find(jsSentence, 0)
-                        semiColon = html.find(";", init)
-
-                        line = html[init + len(jsSentence) + 1 : semiColon - 1]
-                        parts = line.split(',"')
-                        if len(parts) >= 4:
-                            nextEpisode = parts[3].replace('"','')
-
-
-                    #description
-                    #body > div.Wrapper > div > div > div.Container > div > main > section:nth-child(1) > div.Description > p
-                    description = soup.find('div', class_="Description").find('p').text
-
-                    anime['lastSeen'] = lastSeen
-                    anime['episodesCount'] = episodesCount
-                    anime['inEmission'] = inEmission
-                    anime['nextEpisode'] = nextEpisode
-                    anime['progress'] = round(lastSeen / episodesCount * 100, 2)
-                    anime['today'] = nextEpisode == today
-                    anime["nextToWatch"] = nextToWatch
-                    anime["description"] = description
+                    page_animes[key] = data
+                    details.append(
+                        asyncio.create_task(
+                            self._async_fetch_detail(key, data, today, semaphore)
+                        )
+                    )
 
+            async def fetch_page(page: int) -> bool:
+                try:
+                    followed = await self._async_get_followed_page(page, semaphore)
+                except AnimeFlvApiClientError as exception:
+                    LOGGER.warning("Error fetching page %s of the followed list: %s", page, exception)
+                    return False
+                if followed is None:
+                    return False
+                add_page(page, followed)
+                return True
+
+            try:
+                first = await self._async_get_followed_page(1, semaphore, relogin=True)
+            except AnimeFlvApiClientAuthenticationError:
+                raise
+            except AnimeFlvApiClientError as exception:
+                LOGGER.warning("Error fetching the followed list: %s", exception)
+                first = None
+            if first is None:
+                if not self._animes:
+                    raise AnimeFlvApiClientCommunicationError(
+                        "Error fetching the followed list",
+                    )
+                LOGGER.warning("Keeping the last known animes")
+                self.failed = set(self._animes)
+                metrics.duration = time.perf_counter() - start
+                return self._animes
+
+            #read if more pages
+            self._plan_budget(first.total_pages - 1)
+            others = [
+                asyncio.create_task(fetch_page(page))
+                for page in range(2, first.total_pages + 1)
+            ]
+            add_page(1, first)
+            try:
+                complete = all(await asyncio.gather(*others))
+            finally:
+                # details keep being added while the pages come in
+                await asyncio.gather(*details)
+
+            for page in sorted(pages):
+                animes.update(pages[page])
+            if not complete:
+                for key, anime in self._animes.items():
+                    animes.setdefault(key, anime)
+
+            if self._cache is not None:
+                self._cache.prune(animes)
+                metrics.cache_hits = self._cache.hits
+                metrics.cache_misses = self._cache.misses
+
+        metrics.duration = time.perf_counter() - start
+        LOGGER.debug("Refresh of %s animes: %s", len(animes), metrics.as_dict())
         self._animes = animes
-        await self.async_logout()
         return animes
 
-    async def _api_wrapper(
+    async def _async_get_followed_page(
         self,
-        method: str,
-        url: str,
-        data: dict | None = None,
-        headers: dict | None = None,
-    ) -> any:
-        """Get information from the API."""
+        page: int,
+        semaphore: asyncio.Semaphore,
+        relogin: bool = False,
+    ) -> FollowedPage | None:
+        """Fetch and parse a page of the followed list, None when it failed.
+
+        The request is conditional, an unchanged page is not parsed again.
+        """
+        async with semaphore:
+            with self.metrics.phase("pagination"):
+                url = f"{self._host}/perfil/{self._profile}/siguiendo??order=title&page={page}"
+                validators, cached = self._followed_pages.get(url, ({}, None))
+                headers = _conditional_headers(validators)
+                response = await self.get(url, headers)
+            if relogin and self._requires_login(response):
+                with self.metrics.phase("auth"):
+                    await self.async_login()
+                with self.metrics.phase("pagination"):
+                    url = f"{self._host}/perfil/{self._profile}/siguiendo??order=title&page={page}"
+                    response = await self.get(url, headers)
+        if response.not_modified and cached is not None:
+            return cached
+        if response.status_code != 200:
+            LOGGER.warning("Error fetching page %s of the followed list", page)
+            return None
+        followed = await self._async_parse(parse_followed_page, response.text)
+        if response.validators:
+            self._followed_pages[url] = (response.validators, followed)
+        return followed
+
+    async def _async_fetch_detail(
+        self,
+        key: str,
+        anime: FollowedAnime,
+        today: str,
+        semaphore: asyncio.Semaphore,
+        force: bool = False,
+    ) -> None:
+        """Fill an anime with its cached or freshly fetched detail page.
+
+        The anime is updated in place, so the result does not depend on
+        the order the requests complete in. A failing anime, or one whose
+        detail cannot be applied, is logged and keeps its last known detail,
+        the same as a non 200 response. With force the page is fetched
+        whatever the cache and the request budget say.
+        """
         try:
-            async with async_timeout.timeout(10):
-                response = await self._session.request(
-                    method=method,
-                    url=url,
-                    headers=headers,
-                    json=data,
-                )
-                if response.status in (401, 403):
-                    raise AnimeFlvApiClientAuthenticationError(
-                        "Invalid credentials",
-                    )
-                response.raise_for_status()
-                return await response.json()
+            if self._cache is not None and not force:
+                detail = self._cache.get(key)
+                if detail is not None:
+                    self._apply_detail(anime, detail, today)
+                    return
+            if (
+                not force
+                and self._affordable is not None
+                and key not in self._affordable
+                and self._cache.peek(key) is not None
+            ):
+                self._defer(key, anime, today)
+                return
+            detail = await self._async_load_detail(key, anime.href, semaphore, force)
+            if detail is None:
+                self._defer(key, anime, today)
+                return
+            self._apply_detail(anime, detail, today)
+        except Exception as exception:  # pylint: disable=broad-except
+            self._fail(key, anime, today, exception)
 
-        except asyncio.TimeoutError as exception:
+    async def _async_load_detail(
+        self,
+        key: str,
+        url: str,
+        semaphore: asyncio.Semaphore,
+        force: bool = False,
+    ) -> dict | None:
+        """Return the freshly read detail of an anime, None when over budget.
+
+        Loads of the same anime running at the same time, such as a single
+        anime refresh during a full refresh, share one request. A load that
+        started before the anime was marked watched is not shared, its page
+        may predate the change.
+        """
+        loading = self._loading.get(key)
+        if loading is None or loading[0] < self._marked.get(key, 0):
+            task = asyncio.create_task(
+                self._async_request_detail(key, url, semaphore, force)
+            )
+            loading = self._loading[key] = (time.monotonic(), task)
+
+            def done(task: asyncio.Task) -> None:
+                if self._loading.get(key) is loading:
+                    del self._loading[key]
+                if not task.cancelled():
+                    # retrieved even when every waiter was cancelled
+                    task.exception()
+
+            task.add_done_callback(done)
+        # a cancelled refresh does not cancel the request others wait for
+        detail = await asyncio.shield(loading[1])
+        if detail is None and force:
+            # the shared load was over the budget of its refresh
+            detail = await self._async_request_detail(key, url, semaphore, force)
+        return detail
+
+    async def _async_request_detail(
+        self,
+        key: str,
+        url: str,
+        semaphore: asyncio.Semaphore,
+        force: bool,
+    ) -> dict | None:
+        """Fetch and parse the detail page of an anime, see _async_load_detail."""
+        async with semaphore:
+            if self._budget_left() <= 0 and not force:
+                return None
+            stale = self._cache.peek(key) if self._cache is not None else None
+            validators = {}
+            if stale is not None and not force:
+                validators = stale.get("validators", {})
+            with self.metrics.phase("details"), self.metrics.slug(key):
+                response = await self.get(url, _conditional_headers(validators))
+        # parsed outside of the semaphore, the next request goes out meanwhile
+        if response.not_modified and stale is not None:
+            detail = {field: stale[field] for field in DETAIL_FIELDS}
+        else:
+            if response.status_code != 200:
+                raise AnimeFlvApiClientCommunicationError(
+                    f"Status {response.status_code}",
+                )
+            detail = await self._async_parse(parse_detail, response.text)
+            validators = response.validators
+        if self._cache is not None:
+            self._cache.set(key, detail, validators)
+        return detail
+
+    def _fail(
+        self, key: str, anime: FollowedAnime, today: str, exception: Exception
+    ) -> None:
+        """Keep the last known detail of an anime whose detail page failed."""
+        LOGGER.warning("Error fetching %s: %s", key, exception)
+        self.failed.add(key)
+        self._apply_last_known(key, anime, today)
+
+    async def _async_parse(self, parse, html: str):
+        """Parse html in the parse workers, counting the time it took."""
+        result, seconds = await self._parse_pool.async_parse(parse, html)
+        self.metrics.add_parse_time(seconds)
+        return result
+
+    async def async_refresh_animes(self, keys: Iterable[str]) -> None:
+        """Fetch the detail pages of some followed animes again, nothing else.
+
+        The cache and the request budget are skipped and the followed list
+        is not read. Every anime is tried, the first error is raised
+        afterwards, the failed animes keep their data.
+        """
+        await self._async_ensure_login()
+        today = dt_util.now().date().isoformat()
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def refresh(key: str) -> None:
+            detail = await self._async_load_detail(
+                key, self._animes[key].href, semaphore, force=True
+            )
+            # a full refresh may have replaced the animes meanwhile
+            if (anime := self._animes.get(key)) is not None:
+                self._apply_detail(anime, detail, today)
+
+        keys = [key for key in keys if key in self._animes]
+        results = await asyncio.gather(
+            *(refresh(key) for key in keys), return_exceptions=True
+        )
+        errors = [result for result in results if isinstance(result, Exception)]
+        for key, result in zip(keys, results):
+            if isinstance(result, Exception):
+                LOGGER.warning("Error fetching %s: %s", key, result)
+        if errors:
+            raise errors[0]
+
+    def set_last_seen(self, key: str, last_seen: int) -> None:
+        """Show episodes up to last_seen as seen, before the site confirms it."""
+        anime = self._animes.get(key)
+        if anime is None or not anime.has_detail:
+            return
+        detail = {field: getattr(anime, field) for field in DETAIL_FIELDS}
+        detail["lastSeen"] = max(anime.lastSeen, min(last_seen, anime.episodesCount))
+        self._apply_detail(anime, detail, dt_util.now().date().isoformat())
+
+    async def async_mark_watched(self, episodes: dict[str, Iterable[int]]) -> None:
+        """Mark episodes of followed animes seen, the numbers keyed by slug.
+
+        The animes are handled in parallel, their episodes one after the
+        other. Every anime is tried, the first error is raised afterwards.
+        """
+        await self._async_ensure_login()
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+        results = await asyncio.gather(
+            *(
+                self._async_mark_anime(key, numbers, semaphore)
+                for key, numbers in episodes.items()
+            ),
+            return_exceptions=True,
+        )
+        for key, result in zip(episodes, results):
+            if isinstance(result, Exception):
+                LOGGER.warning("Error marking episodes of %s seen: %s", key, result)
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            raise errors[0]
+
+    async def _async_mark_anime(
+        self, key: str, numbers: Iterable[int], semaphore: asyncio.Semaphore
+    ) -> None:
+        """Mark episodes of an anime seen, reading their ids off its page."""
+        async with semaphore:
+            response = await self.get(f"{self._host}/anime/{key}")
+        if response.status_code != 200:
             raise AnimeFlvApiClientCommunicationError(
-                "Timeout error fetching information",
-            ) from exception
-        except (aiohttp.ClientError, socket.gaierror) as exception:
+                f"Status {response.status_code}",
+            )
+        ids = await self._async_parse(parse_episodes, response.text)
+        missing = [number for number in numbers if number not in ids]
+        if missing:
+            raise AnimeFlvApiClientError(f"{key} has no episode {missing[0]}")
+        try:
+            async with semaphore:
+                for number in numbers:
+                    response = await self.post(
+                        f"{self._host}{MARK_SEEN_PATH}", {"id": ids[number], "seen": "1"}
+                    )
+                    if response.status_code != 200 or self._requires_login(response):
+                        raise AnimeFlvApiClientCommunicationError(
+                            f"Status {response.status_code} marking episode {number}",
+                        )
+        finally:
+            # the pages being read now may not show the episodes marked
+            self._marked[key] = time.monotonic()
+            # nor does the cached detail, the next refresh reads the page
+            # even if the one right after marking fails
+            if self._cache is not None:
+                self._cache.invalidate(key)
+
+    async def async_get_info(self, key: str) -> dict:
+        """Return the description of an anime, from the cache or its detail page.
+
+        Descriptions barely change and are only needed to show them, so they
+        are not read by the refresh and are cached for INFO_TTL instead.
+        """
+        if self._cache is not None:
+            info = self._cache.get_info(key)
+            if info is not None:
+                return info
+        await self._async_ensure_login()
+        response = await self.get(f"{self._host}/anime/{key}")
+        if response.status_code != 200:
             raise AnimeFlvApiClientCommunicationError(
-                "Error fetching information",
-            ) from exception
-        except Exception as exception:  # pylint: disable=broad-except
-            raise AnimeFlvApiClientError(
-                "Something really wrong happened!"
-            ) from exception
+                f"Status {response.status_code}",
+            )
+        info = await self._async_parse(parse_info, response.text)
+        if self._cache is not None:
+            self._cache.set_info(key, info)
+        return info
+
+    def _budget_left(self) -> float:
+        """Return how many requests this refresh may still send."""
+        if self._request_budget is None:
+            return float("inf")
+        return self._request_budget - self._sent
+
+    def _plan_budget(self, pages_left: int) -> None:
+        """Pick the stale cached animes this refresh can afford, stalest first.
+
+        Animes never fetched are not planned, they only need budget left when
+        their turn comes.
+        """
+        if self._request_budget is None or self._cache is None:
+            return
+        stale = self._cache.stale_slugs()
+        self._affordable = set(stale[: max(0, int(self._budget_left()) - pages_left)])
+
+    def _defer(self, key: str, anime: FollowedAnime, today: str) -> None:
+        """Leave an anime for the next refresh, with its last known detail."""
+        self.deferred.add(key)
+        self.metrics.deferred += 1
+        self._apply_last_known(key, anime, today)
+
+    def _apply_last_known(self, key: str, anime: FollowedAnime, today: str) -> None:
+        """Fill an anime with its last known detail, if it has a usable one."""
+        detail = self._last_known_detail(key)
+        if detail is None:
+            return
+        try:
+            self._apply_detail(anime, detail, today)
+        except (KeyError, TypeError, ValueError) as exception:
+            LOGGER.warning("Ignoring the last known detail of %s: %s", key, exception)
+
+    def _last_known_detail(self, key: str) -> dict | None:
+        """Return the newest detail of an anime, however old it is."""
+        if self._cache is not None:
+            detail = self._cache.peek(key)
+            if detail is not None:
+                return detail
+        anime = self._animes.get(key)
+        if anime is None or not anime.has_detail:
+            return None
+        return {field: getattr(anime, field) for field in DETAIL_FIELDS}
+
+    def _apply_detail(self, anime: FollowedAnime, detail: dict, today: str) -> None:
+        """Fill an anime from its parsed (or cached) detail."""
+        url = anime.href
+        lastSeen = detail["lastSeen"]
+        episodesCount = detail["episodesCount"]
+        nextEpisode = detail["nextEpisode"]
+
+        #episodeList > li:nth-child(6) > a
+        nextToWatch = None
+        if lastSeen < episodesCount:
+            part = url.split("/")[-1]
+            nextToWatch = self._host + "/ver/" + part + "-" + str(lastSeen + 1)
+
+        anime.lastSeen = lastSeen
+        anime.episodesCount = episodesCount
+        anime.inEmission = detail["inEmission"]
+        anime.nextEpisode = nextEpisode
+        # announced animes have no episode out yet
+        anime.progress = (
+            round(lastSeen / episodesCount * 100, 2) if episodesCount else 0.0
+        )
+        anime.today = nextEpisode == today
+        anime.nextToWatch = nextToWatch
+
+
+def _conditional_headers(validators: dict) -> dict | None:
+    """Return the headers making a request conditional on validators."""
+    headers = {}
+    if "etag" in validators:
+        headers["If-None-Match"] = validators["etag"]
+    if "last-modified" in validators:
+        headers["If-Modified-Since"] = validators["last-modified"]
+    return headers or None
@@ -0,0 +1,191 @@
+"""Persistent cache of parsed anime detail pages."""
+from __future__ import annotations
+
+import time
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import INFO_TTL, STORAGE_VERSION
+from .scheduler import next_refresh
+
+SAVE_DELAY = 30
+
+# the only field of a detail page that depends on the account reading it
+ACCOUNT_FIELDS = ("lastSeen",)
+
+
+class AnimeFlvDetailCache:
+    """Parsed detail pages keyed by anime slug, stored on disk.
+
+    The public part of a detail (status, episodes, airing date) and the
+    description are shared by every account following the anime, what each
+    account has seen is kept apart. Accounts use it through for_account.
+    """
+
+    def __init__(self, hass: HomeAssistant, key: str) -> None:
+        """Initialize."""
+        self._store = Store(hass, STORAGE_VERSION, key)
+        # slug -> public fields and when they were fetched
+        self._details: dict[str, dict] = {}
+        # account -> slug -> last seen, when it was fetched and when it is due
+        self._seen: dict[str, dict[str, dict]] = {}
+        # slug -> description and when it was fetched, see get_info
+        self._info: dict[str, dict] = {}
+
+    async def async_load(self) -> None:
+        """Load the cached details from disk."""
+        data = await self._store.async_load()
+        if data:
+            self._details = data.get("details", {})
+            self._seen = data.get("seen", {})
+            self._info = data.get("info", {})
+
+    def for_account(self, account: str) -> AccountDetailCache:
+        """Return the view of the cache seen by account."""
+        return AccountDetailCache(self, account)
+
+    def get_info(self, slug: str) -> dict | None:
+        """Return the description of slug if fetched less than INFO_TTL ago."""
+        info = self._info.get(slug)
+        if info is None or time.time() >= info["fetched"] + INFO_TTL.total_seconds():
+            return None
+        return {key: value for key, value in info.items() if key != "fetched"}
+
+    def set_info(self, slug: str, info: dict) -> None:
+        """Store a freshly parsed description."""
+        self._info[slug] = {**info, "fetched": time.time()}
+        self._save()
+
+    def _get(self, account: str, slug: str) -> tuple[dict, dict] | None:
+        public = self._details.get(slug)
+        seen = self._seen.get(account, {}).get(slug)
+        if public is None or seen is None:
+            return None
+        return public, seen
+
+    def _set(
+        self, account: str, slug: str, detail: dict, validators: dict | None = None
+    ) -> None:
+        fetched = time.time()
+        public = {
+            key: value for key, value in detail.items() if key not in ACCOUNT_FIELDS
+        }
+        self._details[slug] = {**public, "fetched": fetched}
+        self._seen.setdefault(account, {})[slug] = {
+            **{key: detail[key] for key in ACCOUNT_FIELDS},
+            "fetched": fetched,
+            "due": next_refresh(detail, fetched),
+        }
+        if validators:
+            # ETag and Last-Modified of the page, it shows what the account saw
+            self._seen[account][slug]["validators"] = validators
+        # a new episode found by one account makes the others behind too
+        for other, seen in self._seen.items():
+            entry = seen.get(slug)
+            if other == account or entry is None:
+                continue
+            due = next_refresh({**public, **entry}, entry["fetched"])
+            entry["due"] = min(entry["due"], due)
+        self._save()
+
+    def _invalidate(self, account: str, slug: str) -> None:
+        if self._seen.get(account, {}).pop(slug, None) is not None:
+            self._save()
+
+    def _prune(self, account: str, slugs) -> None:
+        seen = self._seen.get(account, {})
+        stale = seen.keys() - set(slugs)
+        for slug in stale:
+            del seen[slug]
+        followed = set().union(*self._seen.values())
+        orphans = (self._details.keys() | self._info.keys()) - followed
+        for slug in orphans:
+            self._details.pop(slug, None)
+            self._info.pop(slug, None)
+        if stale or orphans:
+            self._save()
+
+    def remove_account(self, account: str) -> None:
+        """Forget what account has seen, and the animes nobody else follows."""
+        self._prune(account, ())
+        if self._seen.pop(account, None) is not None:
+            self._save()
+
+    def _save(self) -> None:
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _data_to_save(self) -> dict:
+        return {"details": self._details, "seen": self._seen, "info": self._info}
+
+
+class AccountDetailCache:
+    """The details of the animes followed by one account.
+
+    How long a detail stays fresh is decided by scheduler.next_refresh.
+    """
+
+    def __init__(self, cache: AnimeFlvDetailCache, account: str) -> None:
+        """Initialize."""
+        self._cache = cache
+        self._account = account
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, slug: str) -> dict | None:
+        """Return the cached detail of slug if it is still fresh."""
+        entry = self._cache._get(self._account, slug)
+        if entry is None or time.time() >= entry[1].get("due", 0):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return {**entry[0], **entry[1]}
+
+    def peek(self, slug: str) -> dict | None:
+        """Return the cached detail of slug even if stale, without counting it."""
+        entry = self._cache._get(self._account, slug)
+        return None if entry is None else {**entry[0], **entry[1]}
+
+    def set(self, slug: str, detail: dict, validators: dict | None = None) -> None:
+        """Store a freshly parsed or revalidated detail, with its page validators."""
+        self._cache._set(self._account, slug, detail, validators)
+
+    def get_info(self, slug: str) -> dict | None:
+        """Return the shared description of slug, see AnimeFlvDetailCache."""
+        return self._cache.get_info(slug)
+
+    def set_info(self, slug: str, info: dict) -> None:
+        """Store a freshly parsed description for every account."""
+        self._cache.set_info(slug, info)
+
+    def invalidate(self, slug: str) -> None:
+        """Force the next refresh to fetch slug again, when episodes were marked seen."""
+        self._cache._invalidate(self._account, slug)
+
+    def prune(self, slugs) -> None:
+        """Drop the animes that are no longer followed."""
+        self._cache._prune(self._account, slugs)
+
+    def reset_stats(self) -> None:
+        """Reset the hit and miss counters."""
+        self.hits = 0
+        self.misses = 0
+
+    def stale_slugs(self) -> list[str]:
+        """Return the slugs whose detail is stale, stalest first."""
+        now = time.time()
+        stale = [
+            (entry.get("due", 0), slug)
+            for slug, entry in self._entries().items()
+            if now >= entry.get("due", 0)
+        ]
+        return [slug for _, slug in sorted(stale)]
+
+    def next_due(self) -> float | None:
+        """Return when the first cached detail becomes stale."""
+        return min(
+            (entry.get("due", 0) for entry in self._entries().values()), default=None
+        )
+
+    def _entries(self) -> dict[str, dict]:
+        return self._cache._seen.get(self._account, {})
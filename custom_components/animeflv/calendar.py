@@ -0,0 +1,74 @@
+"""Calendar platform for animeflv, the next episode of every followed anime."""
+from __future__ import annotations
+
+import datetime
+
+from homeassistant.components.calendar import CalendarEntity, CalendarEvent
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .coordinator import AnimeFlvDataUpdateCoordinator
+from .entity import AnimeFlvEntity
+from .models import FollowedAnime
+
+
+async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry, async_add_entities):
+    """Set up the calendar platform."""
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    async_add_entities([AnimeFlvCalendar(coordinator=coordinator)])
+
+
+def _event(key: str, anime: FollowedAnime) -> CalendarEvent | None:
+    """Return the all day event of the next episode of an anime."""
+    date = anime.next_episode_date
+    if date is None:
+        return None
+    return CalendarEvent(
+        start=date,
+        end=date + datetime.timedelta(days=1),
+        summary=f"{anime.title} {(anime.episodesCount or 0) + 1}",
+        description=anime.href,
+        uid=f"{key}-{anime.nextEpisode}",
+    )
+
+
+class AnimeFlvCalendar(AnimeFlvEntity, CalendarEntity):
+    """The dates AnimeFLV announces for the next episodes."""
+
+    _attr_icon = "mdi:calendar-star"
+    _attr_name = "Next episodes"
+
+    def __init__(self, coordinator: AnimeFlvDataUpdateCoordinator) -> None:
+        """Initialize the calendar class."""
+        super().__init__(None, coordinator)
+        self._attr_unique_id = f"{DOMAIN}_{coordinator.config_entry.title}_calendar"
+
+    @property
+    def event(self) -> CalendarEvent | None:
+        """Return the next episode airing, today's included."""
+        today = dt_util.now().date()
+        upcoming = [
+            event
+            for key, anime in (self.coordinator.data or {}).items()
+            if (event := _event(key, anime)) is not None and event.start >= today
+        ]
+        return min(upcoming, key=lambda event: event.start, default=None)
+
+    async def async_get_events(
+        self,
+        hass: HomeAssistant,
+        start_date: datetime.datetime,
+        end_date: datetime.datetime,
+    ) -> list[CalendarEvent]:
+        """Return the episodes airing between start_date and end_date."""
+        start, end = start_date.date(), end_date.date()
+        events = [
+            event
+            for key, anime in (self.coordinator.data or {}).items()
+            if (event := _event(key, anime)) is not None
+            and event.start <= end
+            and event.end > start
+        ]
+        return sorted(events, key=lambda event: (event.start, event.summary))
@@ -5,18 +5,29 @@ from collections import OrderedDict
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import callback
 from homeassistant.helpers import selector
 from homeassistant.helpers.aiohttp_client import async_create_clientsession
 
 
 
 from .api import (
-    AnimeFlvApiClient,
     AnimeFlvApiClientAuthenticationError,
     AnimeFlvApiClientCommunicationError,
     AnimeFlvApiClientError,
 )
-from .const import DOMAIN, LOGGER, DEFAULT_CONF_PASSWORD, DEFAULT_CONF_USERNAME
+from .const import (
+    CONF_MAX_CONCURRENCY,
+    CONF_PROFILE,
+    CONF_REQUEST_BUDGET,
+    DEFAULT_CONF_PASSWORD,
+    DEFAULT_CONF_USERNAME,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_REQUEST_BUDGET,
+    DOMAIN,
+    LOGGER,
+)
+from .pool import async_get_client_pool
 
 try:
     from .secrets import DEFAULT_CONF_PASSWORD, DEFAULT_CONF_USERNAME
@@ -29,6 +40,14 @@ class BlueprintFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        """Get the options flow for this handler."""
+        return AnimeFlvOptionsFlowHandler(config_entry)
+
     async def async_step_user(
         self,
         user_input: dict | None = None,
@@ -36,6 +55,9 @@ class BlueprintFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         """Handle a flow initialized by the user."""
         self._errors = {}
         if user_input is not None:
+            # the client of an account is shared, so is its config entry
+            await self.async_set_unique_id(user_input[CONF_USERNAME].lower())
+            self._abort_if_unique_id_configured()
             try:
                 profile = await self._test_credentials(
                     username=user_input[CONF_USERNAME],
@@ -77,5 +99,45 @@ class BlueprintFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
 
     async def _test_credentials(self, username: str, password: str) -> None:
         """Validate credentials."""
-        client = AnimeFlvApiClient(username=username,password=password,hass = self.hass)
-        return await client.async_login()
+        pool = async_get_client_pool(self.hass)
+        client = await pool.async_acquire(username=username, password=password)
+        try:
+            return await client.async_login()
+        finally:
+            await pool.async_release(client)
+
+
+class AnimeFlvOptionsFlowHandler(config_entries.OptionsFlow):
+    """Options flow for AnimeFLV."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize options flow."""
+        self.config_entry = config_entry
+
+    async def async_step_init(
+        self,
+        user_input: dict | None = None,
+    ) -> config_entries.FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        data_schema = OrderedDict()
+        data_schema[
+            vol.Required(
+                CONF_MAX_CONCURRENCY,
+                default=options.get(CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY),
+            )
+        ] = vol.All(vol.Coerce(int), vol.Range(min=1, max=16))
+        data_schema[
+            vol.Required(
+                CONF_REQUEST_BUDGET,
+                default=options.get(CONF_REQUEST_BUDGET, DEFAULT_REQUEST_BUDGET),
+            )
+        ] = vol.All(vol.Coerce(int), vol.Range(min=10))
+        data_schema[
+            vol.Required(CONF_PROFILE, default=options.get(CONF_PROFILE, False))
+        ] = bool
+
+        return self.async_show_form(step_id="init", data_schema=vol.Schema(data_schema))
@@ -1,4 +1,5 @@
 """Constants for integration_blueprint."""
+from datetime import timedelta
 from logging import Logger, getLogger
 
 LOGGER: Logger = getLogger(__package__)
@@ -7,7 +8,53 @@ NAME = "AnimeFLV"
 DOMAIN = "animeflv"
 VERSION = "0.0.1"
 ATTRIBUTION = "Data provided by https://www3.animeflv.net"
+ANIMEFLV_HOST = "https://www3.animeflv.net"
 
 
 DEFAULT_CONF_PASSWORD = ""
-DEFAULT_CONF_USERNAME = ""
\ No newline at end of file
+DEFAULT_CONF_USERNAME = ""
+
+CONF_MAX_CONCURRENCY = "max_concurrency"
+DEFAULT_MAX_CONCURRENCY = 4
+# run every refresh under cProfile, for diagnostics
+CONF_PROFILE = "profile"
+# requests per refresh, the freshest detail pages wait for the next one
+CONF_REQUEST_BUDGET = "request_budget"
+DEFAULT_REQUEST_BUDGET = 300
+# requests per second to the host, shared by every account, and burst size
+RATE_LIMIT = 4.0
+RATE_LIMIT_BURST = 8
+# threads parsing the fetched pages, and pages handed to a thread at once
+PARSE_WORKERS = 2
+PARSE_BATCH_SIZE = 8
+
+# posted with the id of an episode to mark it seen by the logged in account
+MARK_SEEN_PATH = "/api/animes/markEpisode"
+
+# how often a detail page is fetched again, see scheduler.py
+REFRESH_RELEASE_DAY = timedelta(minutes=15)
+# how long after the announced date the release day pace is kept
+RELEASE_WINDOW = timedelta(days=2)
+REFRESH_PROGRESS = timedelta(hours=1)
+REFRESH_IDLE = timedelta(hours=24)
+# bounds of the interval between two coordinator refreshes
+MIN_UPDATE_INTERVAL = timedelta(minutes=5)
+MAX_UPDATE_INTERVAL = timedelta(hours=1)
+STORAGE_VERSION = 1
+# descriptions are fetched on demand and kept this long
+INFO_TTL = timedelta(days=7)
+
+# seconds before a single request is abandoned
+REQUEST_TIMEOUT = 10
+# seconds the cloudscraper fallback stays active after repeated challenges
+CHALLENGE_COOLDOWN = 3600
+
+# attempts of a request failing with a connection error or a retryable status
+RETRY_ATTEMPTS = 3
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# seconds, the delay before attempt n is random up to RETRY_BACKOFF * 2**n
+RETRY_BACKOFF = 1.0
+RETRY_BACKOFF_MAX = 30.0
+# consecutive failures that open the circuit, and seconds it stays open
+CIRCUIT_FAILURES = 5
+CIRCUIT_COOLDOWN = 60.0
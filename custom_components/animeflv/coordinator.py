@@ -2,21 +2,33 @@
 from __future__ import annotations
 
 from datetime import timedelta
+import io
+import time
+from typing import TYPE_CHECKING
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     UpdateFailed,
 )
-from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.exceptions import ConfigEntryAuthFailed, HomeAssistantError
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
 
 from .api import (
     AnimeFlvApiClient,
     AnimeFlvApiClientAuthenticationError,
     AnimeFlvApiClientError,
 )
-from .const import DOMAIN, LOGGER
+from .const import DOMAIN, LOGGER, MAX_UPDATE_INTERVAL, MIN_UPDATE_INTERVAL
+from .models import AnimeIndex, FollowedAnimes
+
+if TYPE_CHECKING:
+    import cProfile
+
+SNAPSHOT_SAVE_DELAY = 30
 
 
 # https://developers.home-assistant.io/docs/integration_fetching_data#coordinated-single-api-poll-for-data-for-all-entities
@@ -29,21 +41,234 @@ class AnimeFlvDataUpdateCoordinator(DataUpdateCoordinator):
         self,
         hass: HomeAssistant,
         client: AnimeFlvApiClient,
+        profile: bool = False,
+        snapshot_store: Store | None = None,
     ) -> None:
         """Initialize."""
         self.client = client
+        # the animes of the last successful refresh, restored at startup
+        self._snapshot_store = snapshot_store
+        self.profile = profile
+        # cProfile report of the last refresh when profile is set
+        self.last_profile: str | None = None
+        # slugs whose data changed in the last refresh, None means all of them
+        self.changed: set[str] | None = None
+        # slugs followed and unfollowed since the previous refresh
+        self.added: set[str] = set()
+        self.removed: set[str] = set()
+        # animes airing soon and left to watch, for the aggregate entities
+        self.index = AnimeIndex()
         super().__init__(
             hass=hass,
             logger=LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(minutes=5),
+            update_interval=MIN_UPDATE_INTERVAL,
+        )
+
+    async def async_restore(self) -> bool:
+        """Restore the animes of the last successful refresh, False if none.
+
+        The entities are created from them right away and the live refresh
+        runs in the background, so startup does not wait for the site.
+        """
+        if self._snapshot_store is None:
+            return False
+        stored = await self._snapshot_store.async_load()
+        if not stored or not stored.get("animes"):
+            return False
+        data = FollowedAnimes.from_dict(stored["animes"])
+        self.client.restore(data)
+        self.data = data
+        self.index = AnimeIndex.build(data, dt_util.now().date())
+        LOGGER.debug(
+            "Restored %s animes of the refresh at %s",
+            len(data),
+            dt_util.utc_from_timestamp(stored["updated"]),
         )
+        return True
 
     async def _async_update_data(self):
         """Update data via library."""
+        self.changed = None
+        self.added = set()
+        self.removed = set()
+        # a refresh that fails in any way is retried soon, a successful one
+        # sets the interval in _schedule_next_update
+        self.update_interval = MIN_UPDATE_INTERVAL
+        profiler = None
+        if self.profile:
+            # only imported when asked for, most setups never profile
+            import cProfile  # pylint: disable=import-outside-toplevel
+
+            profiler = cProfile.Profile()
         try:
-            return await self.client.async_get_data()
+            if profiler is not None:
+                profiler.enable()
+            data = await self.client.async_get_data()
         except AnimeFlvApiClientAuthenticationError as exception:
             raise ConfigEntryAuthFailed(exception) from exception
         except AnimeFlvApiClientError as exception:
             raise UpdateFailed(exception) from exception
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                self.last_profile = self._profile_report(profiler)
+        if self.data is not None:
+            self.added = data.keys() - self.data.keys()
+            self.removed = self.data.keys() - data.keys()
+        if self.last_update_success and self.data is not None:
+            self.changed = data.changed(self.data)
+            LOGGER.debug("%s of %s animes changed", len(self.changed), len(data))
+        self.index = AnimeIndex.build(data, dt_util.now().date())
+        if self.changed is None or self.changed or self.removed:
+            self._save_snapshot(data)
+        self._schedule_next_update()
+        return data
+
+    def _save_snapshot(self, data: FollowedAnimes) -> None:
+        """Store the animes for the next startup, see async_restore."""
+        if self._snapshot_store is None:
+            return
+        self._snapshot_store.async_delay_save(
+            lambda: {"updated": time.time(), "animes": data.as_dict()},
+            SNAPSHOT_SAVE_DELAY,
+        )
+
+    async def async_mark_watched(
+        self, episodes: dict[str, tuple[int | None, int | None]]
+    ) -> None:
+        """Mark ranges of episodes seen, the first and last one keyed by slug.
+
+        The first episode defaults to the next to watch and the last one to
+        the newest out. The animes are shown as seen right away, then their
+        detail pages are read again to get what the site recorded. Nothing
+        is marked when an anime has no episodes to mark.
+        """
+        ranges = {}
+        skipped = []
+        for key, (first, last) in episodes.items():
+            anime = self.data.get(key)
+            if anime is None or not anime.has_detail:
+                skipped.append(f"{key} (detail page not read yet)")
+                continue
+            numbers = range(first or anime.lastSeen + 1, (last or anime.episodesCount) + 1)
+            if not numbers:
+                if first is None and last is None:
+                    skipped.append(f"{key} (every episode seen)")
+                else:
+                    skipped.append(
+                        f"{key} (empty range {numbers.start} to {numbers.stop - 1})"
+                    )
+                continue
+            ranges[key] = numbers
+        if skipped:
+            raise HomeAssistantError(f"Cannot mark episodes seen of {', '.join(skipped)}")
+        for key, numbers in ranges.items():
+            self.client.set_last_seen(key, numbers[-1])
+        self._async_update_animes(set(ranges))
+        try:
+            await self.client.async_mark_watched(ranges)
+        finally:
+            await self.async_refresh_animes(ranges)
+
+    async def async_refresh_animes(self, keys) -> None:
+        """Read the detail pages of some animes again, without a full refresh.
+
+        Only the entities of those animes are updated. A full refresh running
+        at the same time shares the requests of the animes it reads too.
+        """
+        try:
+            await self.client.async_refresh_animes(keys)
+        finally:
+            self._async_update_animes(set(keys) & self.data.keys())
+
+    @callback
+    def _async_update_animes(self, keys: set[str]) -> None:
+        """Tell the entities of keys that their anime changed outside a refresh."""
+        self.changed = keys
+        self.index = AnimeIndex.build(self.data, dt_util.now().date())
+        self._save_snapshot(self.data)
+        self.async_update_listeners()
+
+    @staticmethod
+    def _profile_report(profiler: cProfile.Profile) -> str:
+        """Return the slowest calls of a profiled refresh.
+
+        The profiler sees everything run by the event loop meanwhile, not only
+        this integration.
+        """
+        import pstats  # pylint: disable=import-outside-toplevel
+
+        stream = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stream)
+        stats.sort_stats("cumulative").print_stats(30)
+        return stream.getvalue()
+
+    def _schedule_next_update(self) -> None:
+        """Wait until the first cached detail page is due, within bounds.
+
+        The followed list itself is read on every refresh, so new follows
+        show up within MAX_UPDATE_INTERVAL. Animes that failed or did not
+        fit in the request budget are retried after MIN_UPDATE_INTERVAL.
+        """
+        cache = self.client.cache
+        due = cache.next_due() if cache is not None else None
+        if due is None or self.client.failed or self.client.deferred:
+            self.update_interval = MIN_UPDATE_INTERVAL
+            return
+        interval = timedelta(seconds=max(due - time.time(), 0))
+        self.update_interval = min(
+            max(interval, MIN_UPDATE_INTERVAL), MAX_UPDATE_INTERVAL
+        )
+        LOGGER.debug("Next refresh in %s", self.update_interval)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update the listeners of the animes that changed.
+
+        Entities register their anime slug as context; listeners without a
+        context, or every listener after a failed refresh, are always called.
+
+        Followed and unfollowed animes are announced first, so the platforms
+        add and remove their entities without reloading the entry.
+        """
+        if self.added:
+            async_dispatcher_send(
+                self.hass,
+                f"{DOMAIN}_{self.config_entry.entry_id}_add_{DOMAIN}",
+                self.added,
+            )
+        if self.removed:
+            async_dispatcher_send(
+                self.hass,
+                f"{DOMAIN}_{self.config_entry.entry_id}_remove_{DOMAIN}",
+                self.removed,
+            )
+        self.added = set()
+        self.removed = set()
+
+        changed = self.changed if self.last_update_success else None
+        for update_callback, context in list(self._listeners.values()):
+            if changed is None or context is None or context in changed:
+                update_callback()
+
+
+def coordinator_following(
+    hass: HomeAssistant, key: str
+) -> AnimeFlvDataUpdateCoordinator | None:
+    """Return the coordinator of an account following the anime key."""
+    for coordinator in hass.data.get(DOMAIN, {}).values():
+        if coordinator.data is not None and key in coordinator.data:
+            return coordinator
+    return None
+
+
+def followed_anywhere(hass: HomeAssistant) -> set[str] | None:
+    """Return the slugs followed by at least one account.
+
+    None is returned while an account has not loaded its followed list yet.
+    """
+    coordinators = hass.data.get(DOMAIN, {}).values()
+    if any(coordinator.data is None for coordinator in coordinators):
+        return None
+    return {key for coordinator in coordinators for key in coordinator.data}
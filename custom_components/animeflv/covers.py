@@ -0,0 +1,259 @@
+"""Local copies of the anime covers, served to the dashboards.
+
+Every cover is downloaded once through the client of an account following
+the anime, so the rate limit and the Cloudflare fallback apply. It is
+stored under a name derived from its content, and resized thumbnails are
+made on first request when Pillow is installed. Dashboards get them from
+COVER_URL with ETag and Last-Modified, so browsers revalidate instead of
+downloading them again. The view requires authentication, <img> tags use
+the signed addresses of async_signed_cover_url.
+"""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from datetime import timedelta
+from email.utils import formatdate
+import hashlib
+import importlib
+import os
+from pathlib import Path
+import time
+
+from aiohttp import hdrs, web
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.components.http.auth import async_sign_path
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import STORAGE_DIR, Store
+
+from .const import DOMAIN, LOGGER, STORAGE_VERSION
+from .coordinator import coordinator_following
+from .exceptions import AnimeFlvApiClientCommunicationError, AnimeFlvApiClientError
+
+DATA_COVER_STORE = f"{DOMAIN}_covers"
+COVER_URL = f"/api/{DOMAIN}/cover/{{slug}}"
+SAVE_DELAY = 30
+# how long a signed cover address stays valid, image states are written
+# every five minutes with a new one
+COVER_URL_EXPIRATION = timedelta(hours=1)
+
+# width of the thumbnails that can be asked for with ?size=
+THUMBNAIL_SIZES = {"thumb": 160, "small": 320}
+THUMBNAIL_CONTENT_TYPE = "image/jpeg"
+
+EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/webp": "webp",
+    "image/gif": "gif",
+}
+
+
+@dataclass(slots=True)
+class CoverFile:
+    """A cover, or one of its thumbnails, stored on disk."""
+
+    path: Path
+    content_type: str
+    etag: str
+    # when the cover was downloaded
+    modified: float
+
+
+class AnimeFlvCoverStore:
+    """The covers of the followed animes of every account, keyed by slug."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize."""
+        self._hass = hass
+        self._directory = Path(hass.config.path(STORAGE_DIR, f"{DOMAIN}_covers"))
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.covers")
+        # slug -> url, file name, content type and when it was downloaded
+        self._covers: dict[str, dict] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._load_lock = asyncio.Lock()
+        self._loaded = False
+
+    async def async_get(self, key: str, size: str | None = None) -> CoverFile | None:
+        """Return the cover of key, downloading it the first time.
+
+        None is returned when no account follows key, size is one of
+        THUMBNAIL_SIZES or None for the original.
+        """
+        coordinator = coordinator_following(self._hass, key)
+        if coordinator is None:
+            return None
+        url = coordinator.data[key].cover
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            await self._async_load()
+            cover = self._covers.get(key)
+            if cover is None or cover["url"] != url or not await self._async_exists(cover):
+                cover = await self._async_download(key, url, coordinator.client)
+            path = self._directory / cover["name"]
+            content_type = cover["content_type"]
+            if size is not None:
+                path, content_type = await self._hass.async_add_executor_job(
+                    _thumbnail, path, content_type, THUMBNAIL_SIZES[size]
+                )
+        return CoverFile(
+            path=path,
+            content_type=content_type,
+            etag=f'"{path.stem}"',
+            modified=cover["fetched"],
+        )
+
+    async def async_read(self, cover: CoverFile) -> bytes:
+        """Return the content of a cover."""
+        return await self._hass.async_add_executor_job(cover.path.read_bytes)
+
+    async def async_evict(self, followed: set[str]) -> None:
+        """Delete the covers of the animes no account follows anymore."""
+        await self._async_load()
+        unfollowed = self._covers.keys() - followed
+        if not unfollowed:
+            return
+        names = {self._covers.pop(key)["name"] for key in unfollowed}
+        self._save()
+        await self._hass.async_add_executor_job(self._remove_unused, names)
+
+    async def _async_load(self) -> None:
+        """Load the stored covers, the first time only."""
+        async with self._load_lock:
+            if not self._loaded:
+                self._covers = (await self._store.async_load() or {}).get("covers", {})
+                self._loaded = True
+
+    async def _async_download(self, key: str, url: str, client) -> dict:
+        response = await client.async_get_binary(url)
+        if response.status_code != 200 or not response.content:
+            raise AnimeFlvApiClientCommunicationError(
+                f"Status {response.status_code} fetching the cover of {key}",
+            )
+        content_type = response.headers.get("content-type", "").split(";")[0].strip()
+        digest = hashlib.sha256(response.content).hexdigest()[:32]
+        name = f"{digest}.{EXTENSIONS.get(content_type, 'img')}"
+        previous = self._covers.get(key)
+        self._covers[key] = {
+            "url": url,
+            "name": name,
+            "content_type": content_type or "image/jpeg",
+            "fetched": time.time(),
+        }
+        self._save()
+        await self._hass.async_add_executor_job(self._write, name, response.content)
+        if previous is not None and previous["name"] != name:
+            await self._hass.async_add_executor_job(
+                self._remove_unused, {previous["name"]}
+            )
+        LOGGER.debug("Stored the cover of %s as %s", key, name)
+        return self._covers[key]
+
+    async def _async_exists(self, cover: dict) -> bool:
+        path = self._directory / cover["name"]
+        return await self._hass.async_add_executor_job(path.exists)
+
+    def _write(self, name: str, content: bytes) -> None:
+        path = self._directory / name
+        if path.exists():
+            # same content already stored for another anime
+            return
+        self._directory.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_suffix(".tmp")
+        temporary.write_bytes(content)
+        os.replace(temporary, path)
+
+    def _remove_unused(self, names: set[str]) -> None:
+        used = {cover["name"] for cover in self._covers.values()}
+        for name in names - used:
+            stem = Path(name).stem
+            for path in self._directory.glob(f"{stem}*"):
+                path.unlink(missing_ok=True)
+
+    def _save(self) -> None:
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _data_to_save(self) -> dict:
+        return {"covers": self._covers}
+
+
+def _thumbnail(path: Path, content_type: str, width: int) -> tuple[Path, str]:
+    """Return the thumbnail of path, making it the first time.
+
+    The original is returned when Pillow is not installed or cannot read it.
+    """
+    target = path.with_name(f"{path.stem}-{width}.jpg")
+    if target.exists():
+        return target, THUMBNAIL_CONTENT_TYPE
+    try:
+        image_module = importlib.import_module("PIL.Image")
+    except ImportError:
+        return path, content_type
+    try:
+        with image_module.open(path) as image:
+            image.thumbnail((width, width * 2))
+            temporary = target.with_suffix(".tmp")
+            image.convert("RGB").save(temporary, "JPEG", quality=85)
+    except OSError as exception:
+        LOGGER.warning("Could not resize %s: %s", path.name, exception)
+        return path, content_type
+    os.replace(temporary, target)
+    return target, THUMBNAIL_CONTENT_TYPE
+
+
+class AnimeFlvCoverView(HomeAssistantView):
+    """Serve the stored covers, only of the animes followed by an account."""
+
+    url = COVER_URL
+    name = f"api:{DOMAIN}:cover"
+
+    def __init__(self, store: AnimeFlvCoverStore) -> None:
+        """Initialize."""
+        self._store = store
+
+    async def get(self, request: web.Request, slug: str) -> web.Response:
+        """Return a cover, or 304 when the browser has it already."""
+        size = request.query.get("size")
+        if size is not None and size not in THUMBNAIL_SIZES:
+            return web.Response(status=400)
+        try:
+            cover = await self._store.async_get(slug, size)
+        except AnimeFlvApiClientError as exception:
+            LOGGER.warning("Error fetching the cover of %s: %s", slug, exception)
+            return web.Response(status=502)
+        if cover is None:
+            return web.Response(status=404)
+
+        headers = {
+            hdrs.ETAG: cover.etag,
+            hdrs.LAST_MODIFIED: formatdate(cover.modified, usegmt=True),
+            hdrs.CACHE_CONTROL: "private, max-age=86400",
+        }
+        if_none_match = request.headers.get(hdrs.IF_NONE_MATCH)
+        if if_none_match is not None:
+            if cover.etag in if_none_match:
+                return web.Response(status=304, headers=headers)
+        elif (since := request.if_modified_since) is not None:
+            if int(cover.modified) <= since.timestamp():
+                return web.Response(status=304, headers=headers)
+
+        body = await self._store.async_read(cover)
+        return web.Response(body=body, content_type=cover.content_type, headers=headers)
+
+
+@callback
+def async_signed_cover_url(
+    hass: HomeAssistant, key: str, size: str | None = None
+) -> str:
+    """Return the address of a cover that works without a token, for a while."""
+    path = COVER_URL.format(slug=key)
+    if size is not None:
+        path += f"?size={size}"
+    return async_sign_path(hass, path, COVER_URL_EXPIRATION)
+
+
+def async_get_cover_store(hass: HomeAssistant) -> AnimeFlvCoverStore:
+    """Return the cover store of the domain, serving it the first time."""
+    if DATA_COVER_STORE not in hass.data:
+        hass.data[DATA_COVER_STORE] = store = AnimeFlvCoverStore(hass)
+        hass.http.register_view(AnimeFlvCoverView(store))
+    return hass.data[DATA_COVER_STORE]
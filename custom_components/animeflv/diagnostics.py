@@ -0,0 +1,27 @@
+"""Diagnostics support for AnimeFLV."""
+from __future__ import annotations
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .coordinator import AnimeFlvDataUpdateCoordinator
+
+TO_REDACT = {CONF_PASSWORD, CONF_USERNAME, "unique_id", "title"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict:
+    """Return diagnostics for a config entry."""
+    coordinator: AnimeFlvDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "last_update_success": coordinator.last_update_success,
+        "update_interval": str(coordinator.update_interval),
+        "animes": len(coordinator.data or {}),
+        "last_refresh": coordinator.client.metrics.as_dict(),
+        "profile": coordinator.last_profile,
+    }
@@ -14,10 +14,11 @@ class AnimeFlvEntity(CoordinatorEntity):
     _attr_attribution = ATTRIBUTION
     _attr_has_entity_name = True
 
-    def __init__(self,animeKey: str, coordinator: AnimeFlvDataUpdateCoordinator) -> None:
-        """Initialize."""
-        super().__init__(coordinator)
-        self._attr_name = self.coordinator.data.get(animeKey)["title"]
+    def __init__(self,animeKey: str | None, coordinator: AnimeFlvDataUpdateCoordinator) -> None:
+        """Initialize, animeKey is None for the entities of the whole account."""
+        super().__init__(coordinator, context=animeKey)
+        if animeKey is not None:
+            self._attr_name = self.coordinator.data[animeKey].title
 
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, coordinator.config_entry.entry_id)},
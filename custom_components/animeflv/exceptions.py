@@ -0,0 +1,21 @@
+"""Exceptions raised by the AnimeFLV client."""
+
+
+class AnimeFlvApiClientError(Exception):
+    """Exception to indicate a general API error."""
+
+
+class AnimeFlvApiClientCommunicationError(
+    AnimeFlvApiClientError
+):
+    """Exception to indicate a communication error."""
+
+
+class AnimeFlvApiClientAuthenticationError(
+    AnimeFlvApiClientError
+):
+    """Exception to indicate an authentication error."""
+
+
+class AnimeFlvParseError(AnimeFlvApiClientError):
+    """Exception to indicate a page did not have the expected layout."""
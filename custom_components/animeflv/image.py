@@ -0,0 +1,111 @@
+"""Image platform for animeflv, the cover of every followed anime."""
+from __future__ import annotations
+
+from homeassistant.components.image import ImageEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, LOGGER
+from .coordinator import AnimeFlvDataUpdateCoordinator, followed_anywhere
+from .covers import async_get_cover_store, async_signed_cover_url
+from .entity import AnimeFlvEntity
+from .exceptions import AnimeFlvApiClientError
+
+
+async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry, async_add_entities):
+    """Set up the image platform."""
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+
+    async_add_entities(
+        AnimeFlvCoverImage(coordinator=coordinator, animeKey=key)
+        for key in coordinator.data
+    )
+
+    @callback
+    def async_add_image(keys: set[str]) -> None:
+        async_add_entities(
+            AnimeFlvCoverImage(coordinator=coordinator, animeKey=key) for key in keys
+        )
+
+    @callback
+    def async_remove_image(keys: set[str]) -> None:
+        registry = er.async_get(hass)
+        for key in keys:
+            entity_id = registry.async_get_entity_id(
+                "image", DOMAIN, _unique_id(config_entry, key)
+            )
+            if entity_id is not None:
+                registry.async_remove(entity_id)
+        if (followed := followed_anywhere(hass)) is not None:
+            hass.async_create_task(async_get_cover_store(hass).async_evict(followed))
+
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            f"{DOMAIN}_{config_entry.entry_id}_add_{DOMAIN}",
+            async_add_image,
+        )
+    )
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            f"{DOMAIN}_{config_entry.entry_id}_remove_{DOMAIN}",
+            async_remove_image,
+        )
+    )
+
+
+def _unique_id(config_entry: ConfigEntry, animeKey: str) -> str:
+    """Return the unique id of the cover of an anime."""
+    return f"{DOMAIN}_{config_entry.title}_{animeKey}_cover"
+
+
+class AnimeFlvCoverImage(AnimeFlvEntity, ImageEntity):
+    """The cover of an anime, downloaded once when first shown.
+
+    The image is served from the local cover store, see covers.py, whose
+    thumbnail address is given as an attribute for dashboard cards. It is
+    signed anew whenever the state is written, so it is not recorded.
+    """
+
+    _attr_content_type = "image/jpeg"
+    _unrecorded_attributes = frozenset({"thumbnail"})
+
+    def __init__(self, coordinator: AnimeFlvDataUpdateCoordinator, animeKey: str) -> None:
+        """Initialize the image class."""
+        self.anime = animeKey
+        AnimeFlvEntity.__init__(self, animeKey, coordinator)
+        ImageEntity.__init__(self, coordinator.hass)
+        self._attr_unique_id = _unique_id(coordinator.config_entry, animeKey)
+        self._cover = coordinator.data[animeKey].cover
+        self._attr_image_last_updated = dt_util.utcnow()
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return the signed address of the thumbnail."""
+        return {"thumbnail": async_signed_cover_url(self.hass, self.anime, "thumb")}
+
+    async def async_image(self) -> bytes | None:
+        """Return the cover from the local store."""
+        store = async_get_cover_store(self.hass)
+        try:
+            cover = await store.async_get(self.anime)
+        except AnimeFlvApiClientError as exception:
+            LOGGER.warning("Error fetching the cover of %s: %s", self.anime, exception)
+            return None
+        if cover is None:
+            return None
+        self._attr_content_type = cover.content_type
+        return await store.async_read(cover)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        anime = self.coordinator.data.get(self.anime)
+        if anime is not None and anime.cover != self._cover:
+            self._cover = anime.cover
+            self._attr_image_last_updated = dt_util.utcnow()
+        super()._handle_coordinator_update()
@@ -0,0 +1,111 @@
+"""Extraction of the JavaScript variables embedded in a detail page.
+
+A detail page declares, in an inline script::
+
+    var anime_info = ["3423","Dr. Stone: Stone Wars","dr-stone-stone-wars","2021-01-28"];
+    var episodes = [[11,61525],[10,61524],...];
+    var last_seen = 10;
+
+The variables are read in a single scan of the page, stopping as soon as
+the three of them were seen, and the episodes array is never split: its
+length and first (latest) episode are read off the text.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import re
+
+from .exceptions import AnimeFlvParseError
+
+VARIABLES = ("anime_info", "episodes", "last_seen")
+
+_VARIABLE = re.compile(r"var (anime_info|episodes|last_seen) = ")
+_EPISODE = re.compile(r"\[(\d+),(\d+)\]")
+
+
+@dataclass(slots=True)
+class DetailScript:
+    """The values of the variables of a detail page."""
+
+    episodes_count: int
+    # number of the newest episode, None when there are none yet
+    last_episode: int | None
+    last_seen: int
+    # the anime_info array, when the page has one
+    anime_info: list[str] | None
+
+    @property
+    def next_episode(self) -> str | None:
+        """Return the date of the next episode, set while in emission."""
+        if self.anime_info is None or len(self.anime_info) < 4:
+            return None
+        return self.anime_info[3]
+
+
+def extract_spans(html: str) -> dict[str, tuple[int, int]]:
+    """Return where the source of every variable found in html starts and ends.
+
+    The values are not copied out of html, the episodes array alone can be
+    tens of kilobytes.
+    """
+    found = {}
+    pos = 0
+    while len(found) < len(VARIABLES):
+        match = _VARIABLE.search(html, pos)
+        if match is None:
+            break
+        end = html.find(";", match.end())
+        if end < 0:
+            break
+        found.setdefault(match[1], (match.end(), end))
+        pos = end
+    return found
+
+
+def episodes_count(html: str, start: int, end: int) -> int:
+    """Return the number of episodes of the episodes array in html[start:end]."""
+    # [[n,id],[n,id]] has two numbers, so one comma inside, per episode
+    return (html.count(",", start + 1, end - 1) + 1) // 2
+
+
+def last_episode(html: str, start: int, end: int) -> int | None:
+    """Return the number of the first episode of the array in html[start:end]."""
+    first = html.find("[", start + 1, end)
+    if first < 0:
+        return None
+    comma = html.find(",", first, end)
+    try:
+        return int(html[first + 1 : comma])
+    except ValueError:
+        return None
+
+
+def episode_ids(html: str, start: int, end: int) -> dict[int, int]:
+    """Return the id of every episode number of the array in html[start:end]."""
+    return {
+        int(match[1]): int(match[2]) for match in _EPISODE.finditer(html, start, end)
+    }
+
+
+def parse_anime_info(source: str) -> list[str]:
+    """Return the strings of the source of an anime_info array."""
+    return [part.replace('"', '') for part in source[1:-1].split(',"')]
+
+
+def parse_script(html: str) -> DetailScript:
+    """Read the variables of a detail page."""
+    spans = extract_spans(html)
+    for name in ("episodes", "last_seen"):
+        if name not in spans:
+            raise AnimeFlvParseError(f"var {name} not found")
+    try:
+        last_seen = int(html[slice(*spans["last_seen"])])
+    except ValueError as exception:
+        raise AnimeFlvParseError("var last_seen is not a number") from exception
+    info = spans.get("anime_info")
+    return DetailScript(
+        episodes_count=episodes_count(html, *spans["episodes"]),
+        last_episode=last_episode(html, *spans["episodes"]),
+        last_seen=last_seen,
+        anime_info=parse_anime_info(html[slice(*info)]) if info is not None else None,
+    )
@@ -0,0 +1,82 @@
+"""Timings and counters of a refresh of the AnimeFLV client."""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+import time
+
+SLOWEST_COUNT = 5
+
+
+@dataclass
+class RefreshMetrics:
+    """What a single call to async_get_data cost.
+
+    Phases overlap (details start while pages are still coming in), so a
+    phase is the wall time from its first start to its last end, except for
+    parse which adds up the CPU time the parse workers spent on the pages.
+    """
+
+    started: float = field(default_factory=time.time)
+    duration: float = 0.0
+    phases: dict[str, float] = field(default_factory=dict)
+    requests: int = 0
+    bytes: int = 0
+    retries: int = 0
+    not_modified: int = 0
+    deferred: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    slugs: dict[str, float] = field(default_factory=dict)
+    _spans: dict[str, list[float]] = field(default_factory=dict, repr=False)
+
+    @contextmanager
+    def phase(self, name: str):
+        """Measure a span of the phase name."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            span = self._spans.setdefault(name, [start, end])
+            span[0] = min(span[0], start)
+            span[1] = max(span[1], end)
+            self.phases[name] = span[1] - span[0]
+
+    def add_parse_time(self, seconds: float) -> None:
+        """Add the CPU time spent parsing a page to the parse phase."""
+        self.phases["parse"] = self.phases.get("parse", 0.0) + seconds
+
+    @contextmanager
+    def slug(self, slug: str):
+        """Measure the time spent on the detail page of slug."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.slugs[slug] = time.perf_counter() - start
+
+    def add_response(self, size: int) -> None:
+        """Count a response of size bytes."""
+        self.requests += 1
+        self.bytes += size
+
+    def slowest(self, count: int = SLOWEST_COUNT) -> list[tuple[str, float]]:
+        """Return the slugs whose detail page took the longest."""
+        return sorted(self.slugs.items(), key=lambda item: item[1], reverse=True)[:count]
+
+    def as_dict(self) -> dict:
+        """Return the metrics for diagnostics."""
+        return {
+            "started": self.started,
+            "duration": round(self.duration, 3),
+            "phases": {name: round(value, 3) for name, value in self.phases.items()},
+            "requests": self.requests,
+            "bytes": self.bytes,
+            "retries": self.retries,
+            "not_modified": self.not_modified,
+            "deferred": self.deferred,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "slowest": [[slug, round(value, 3)] for slug, value in self.slowest()],
+        }
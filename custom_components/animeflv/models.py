@@ -0,0 +1,117 @@
+"""Typed records of the followed animes."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field, fields
+import datetime
+
+
+@dataclass(slots=True)
+class FollowedAnime:
+    """An anime of the followed list, with its detail page once read.
+
+    The detail fields stay None until the detail page (or its cached copy)
+    has been applied. The description is not kept here, it is fetched on
+    demand by AnimeFlvApiClient.async_get_info.
+    """
+
+    title: str
+    href: str
+    cover: str
+    lastSeen: int | None = None
+    episodesCount: int | None = None
+    inEmission: bool | None = None
+    nextEpisode: str | None = None
+    progress: float | None = None
+    today: bool | None = None
+    nextToWatch: str | None = None
+
+    @property
+    def has_detail(self) -> bool:
+        """Return True once the detail page was applied."""
+        return self.episodesCount is not None
+
+    @property
+    def unwatched(self) -> int:
+        """Return how many episodes out are not seen yet."""
+        if not self.has_detail:
+            return 0
+        return max(self.episodesCount - self.lastSeen, 0)
+
+    @property
+    def next_episode_date(self) -> datetime.date | None:
+        """Return the date of the next episode, if known."""
+        if not self.nextEpisode:
+            return None
+        try:
+            return datetime.date.fromisoformat(self.nextEpisode)
+        except ValueError:
+            return None
+
+    def as_dict(self) -> dict:
+        """Return the fields as a dict, e.g. to store it."""
+        return {name: getattr(self, name) for name in FIELDS}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> FollowedAnime:
+        """Build an anime from as_dict, ignoring unknown keys."""
+        return cls(**{name: data[name] for name in FIELDS if name in data})
+
+
+FIELDS = tuple(field.name for field in fields(FollowedAnime))
+
+
+class FollowedAnimes(dict[str, FollowedAnime]):
+    """The followed animes keyed by slug, in the order of the followed list."""
+
+    def changed(self, previous: FollowedAnimes) -> set[str]:
+        """Return the slugs whose anime differs from previous, new ones included."""
+        return {key for key, anime in self.items() if previous.get(key) != anime}
+
+    def as_dict(self) -> dict[str, dict]:
+        """Return the animes as plain dicts, e.g. to store them."""
+        return {key: anime.as_dict() for key, anime in self.items()}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, dict]) -> FollowedAnimes:
+        """Build the collection from as_dict."""
+        return cls(
+            (key, FollowedAnime.from_dict(anime)) for key, anime in data.items()
+        )
+
+
+@dataclass(slots=True)
+class AnimeIndex:
+    """Slugs of the followed animes grouped for the aggregate entities.
+
+    Rebuilt once per refresh, so that automations read a single entity
+    instead of going through the sensor of every anime.
+    """
+
+    airing_today: list[str] = field(default_factory=list)
+    # from today to six days later, soonest first
+    airing_week: list[str] = field(default_factory=list)
+    # in the order of the followed list
+    unwatched: list[str] = field(default_factory=list)
+    # the unwatched ones with the most episodes to see first
+    backlog: list[str] = field(default_factory=list)
+
+    @classmethod
+    def build(cls, animes: FollowedAnimes, today: datetime.date) -> AnimeIndex:
+        """Index animes as of the day today."""
+        index = cls()
+        week_end = today + datetime.timedelta(days=6)
+        week = []
+        for key, anime in animes.items():
+            date = anime.next_episode_date
+            if date is not None and today <= date <= week_end:
+                week.append((date, anime.title, key))
+                if date == today:
+                    index.airing_today.append(key)
+            if anime.unwatched:
+                index.unwatched.append(key)
+        index.airing_week = [key for _, _, key in sorted(week)]
+        index.backlog = sorted(
+            index.unwatched,
+            key=lambda key: (-animes[key].unwatched, animes[key].title),
+        )
+        return index
@@ -0,0 +1,261 @@
+"""HTML parsing of the AnimeFLV pages.
+
+Only a handful of nodes are read from every page, so the parsing is done by
+the fastest backend installed: selectolax, then lxml, falling back to
+BeautifulSoup limited by a SoupStrainer to the nodes we need.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import importlib
+
+from .exceptions import AnimeFlvParseError
+from .jsvars import episode_ids, extract_spans, parse_script
+
+
+@dataclass
+class FollowedPage:
+    """The content of a page of the followed list."""
+
+    total_pages: int
+    # (title, href, cover src) of every anime in the page
+    entries: list[tuple[str, str, str]]
+
+
+@dataclass
+class DetailNodes:
+    """The nodes read from the HTML of a detail page."""
+
+    status: str
+    # only read when asked for, see parse_info
+    description: str | None = None
+
+
+def _required(node, what: str):
+    if node is None:
+        raise AnimeFlvParseError(f"{what} not found")
+    return node
+
+
+class ParserBackend:
+    """Extract the nodes we need from the HTML of a page."""
+
+    name: str
+    module: str
+
+    def followed_page(self, html: str) -> FollowedPage:
+        """Parse a page of the followed list."""
+        raise NotImplementedError
+
+    def detail_nodes(self, html: str, description: bool = False) -> DetailNodes:
+        """Parse the nodes of a detail page, the description only if asked."""
+        raise NotImplementedError
+
+
+class SelectolaxBackend(ParserBackend):
+    """Backend using the selectolax lexbor parser."""
+
+    name = "selectolax"
+    module = "selectolax.lexbor"
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._parser = importlib.import_module(self.module).LexborHTMLParser
+
+    def followed_page(self, html: str) -> FollowedPage:
+        """Parse a page of the followed list."""
+        tree = self._parser(html)
+        pagination = _required(tree.css_first("ul.pagination"), "ul.pagination")
+        ul = _required(tree.css_first("ul.ListAnimes"), "ul.ListAnimes")
+        entries = []
+        for li in ul.css("li"):
+            img = _required(li.css_first("img"), "img")
+            a = _required(li.css_first("div.Title strong a"), "div.Title a")
+            entries.append((a.text().strip(), a.attributes["href"], img.attributes["src"]))
+        return FollowedPage(len(pagination.css("li")) - 2, entries)
+
+    def detail_nodes(self, html: str, description: bool = False) -> DetailNodes:
+        """Parse the nodes of a detail page, the description only if asked."""
+        tree = self._parser(html)
+        status = _required(tree.css_first("aside.SidebarA p.AnmStts span"), "p.AnmStts")
+        if not description:
+            return DetailNodes(status.text())
+        text = _required(tree.css_first("div.Description p"), "div.Description")
+        return DetailNodes(status.text(), text.text())
+
+
+def _class_xpath(tag: str, css_class: str) -> str:
+    return f"{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {css_class} ')]"
+
+
+class LxmlBackend(ParserBackend):
+    """Backend using lxml.html."""
+
+    name = "lxml"
+    module = "lxml.html"
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._fromstring = importlib.import_module(self.module).fromstring
+        self._pagination = f"//{_class_xpath('ul', 'pagination')}//li"
+        self._list = f"//{_class_xpath('ul', 'ListAnimes')}"
+        self._title = f".//{_class_xpath('div', 'Title')}//strong//a"
+        self._status = f"//{_class_xpath('aside', 'SidebarA')}//{_class_xpath('p', 'AnmStts')}//span"
+        self._description = f"//{_class_xpath('div', 'Description')}//p"
+
+    def followed_page(self, html: str) -> FollowedPage:
+        """Parse a page of the followed list."""
+        tree = self._fromstring(html)
+        pages = tree.xpath(self._pagination)
+        if not pages:
+            raise AnimeFlvParseError("ul.pagination not found")
+        ul = _required(next(iter(tree.xpath(self._list)), None), "ul.ListAnimes")
+        entries = []
+        for li in ul.iter("li"):
+            img = _required(next(li.iter("img"), None), "img")
+            a = _required(next(iter(li.xpath(self._title)), None), "div.Title a")
+            entries.append((a.text_content().strip(), a.get("href"), img.get("src")))
+        return FollowedPage(len(pages) - 2, entries)
+
+    def detail_nodes(self, html: str, description: bool = False) -> DetailNodes:
+        """Parse the nodes of a detail page, the description only if asked."""
+        tree = self._fromstring(html)
+        status = _required(next(iter(tree.xpath(self._status)), None), "p.AnmStts")
+        if not description:
+            return DetailNodes(status.text_content())
+        text = _required(next(iter(tree.xpath(self._description)), None), "div.Description")
+        return DetailNodes(status.text_content(), text.text_content())
+
+
+def _class_in(*names: str):
+    """Return a SoupStrainer check that a tag has one of the classes names.
+
+    While parsing the strainer is given the whole class attribute.
+    """
+    wanted = frozenset(names)
+    return lambda value: value is not None and not wanted.isdisjoint(value.split())
+
+
+class SoupBackend(ParserBackend):
+    """Backend using BeautifulSoup, only building the subtrees we read."""
+
+    name = "bs4"
+    module = "bs4"
+
+    def __init__(self, strain: bool = True) -> None:
+        """Initialize, strain=False builds the whole tree, to compare."""
+        bs4 = importlib.import_module(self.module)
+        self._soup = bs4.BeautifulSoup
+        self._followed = self._detail = self._info = None
+        if not strain:
+            return
+        # tags are matched by name first, the classes only for those
+        self._followed = bs4.SoupStrainer("ul", class_=_class_in("pagination", "ListAnimes"))
+        self._detail = bs4.SoupStrainer("aside", class_=_class_in("SidebarA"))
+        self._info = bs4.SoupStrainer(
+            ["aside", "div"], class_=_class_in("SidebarA", "Description")
+        )
+
+    def followed_page(self, html: str) -> FollowedPage:
+        """Parse a page of the followed list."""
+        soup = self._soup(html, 'html.parser', parse_only=self._followed)
+        pagination = _required(soup.find('ul', class_='pagination'), "ul.pagination")
+        ul = _required(soup.find('ul', class_='ListAnimes'), "ul.ListAnimes")
+        entries = []
+        for li in ul.find_all('li'):
+            img = _required(li.find('img'), "img")['src']
+            title = _required(li.find('div', class_="Title"), "div.Title")
+            a = _required(title.find('strong'), "strong").find('a')
+            a = _required(a, "div.Title a")
+            entries.append((a.text.strip(), a['href'], img))
+        return FollowedPage(len(pagination.find_all('li')) - 2, entries)
+
+    def detail_nodes(self, html: str, description: bool = False) -> DetailNodes:
+        """Parse the nodes of a detail page, the description only if asked."""
+        strainer = self._info if description else self._detail
+        soup = self._soup(html, 'html.parser', parse_only=strainer)
+        aside = _required(soup.find('aside', class_="SidebarA"), "aside.SidebarA")
+        status = _required(aside.find('p', class_="AnmStts"), "p.AnmStts").find('span')
+        status = _required(status, "p.AnmStts span")
+        if not description:
+            return DetailNodes(status.text)
+        text = _required(soup.find('div', class_="Description"), "div.Description").find('p')
+        text = _required(text, "div.Description p")
+        return DetailNodes(status.text, text.text)
+
+
+# keys of the dict returned by parse_detail
+DETAIL_FIELDS = ("lastSeen", "episodesCount", "inEmission", "nextEpisode")
+
+BACKENDS: tuple[type[ParserBackend], ...] = (SelectolaxBackend, LxmlBackend, SoupBackend)
+
+_backends: dict[str | None, ParserBackend] = {}
+
+
+def available_backends() -> list[str]:
+    """Return the names of the backends that can be imported, fastest first."""
+    names = []
+    for backend in BACKENDS:
+        try:
+            get_backend(backend.name)
+        except ImportError:
+            continue
+        names.append(backend.name)
+    return names
+
+
+def get_backend(name: str | None = None) -> ParserBackend:
+    """Return the backend called name, or the fastest one available."""
+    if name in _backends:
+        return _backends[name]
+    for backend in BACKENDS:
+        if name is not None and backend.name != name:
+            continue
+        try:
+            instance = backend()
+        except ImportError:
+            if name is not None:
+                raise
+            continue
+        _backends[backend.name] = instance
+        if name is None:
+            _backends[None] = instance
+        return instance
+    raise ImportError(f"No parser backend called {name}")
+
+
+def parse_followed_page(html: str, backend: ParserBackend | None = None) -> FollowedPage:
+    """Parse a page of the followed list."""
+    return (backend or get_backend()).followed_page(html)
+
+
+def parse_detail(html: str, backend: ParserBackend | None = None) -> dict:
+    """Parse the fields of an anime detail page needed on every refresh."""
+    nodes = (backend or get_backend()).detail_nodes(html)
+    script = parse_script(html)
+
+    inEmission = nodes.status == 'En emision'
+
+    return {
+        "lastSeen": script.last_seen,
+        "episodesCount": script.episodes_count,
+        "inEmission": inEmission,
+        "nextEpisode": script.next_episode if inEmission else None,
+    }
+
+
+def parse_info(html: str, backend: ParserBackend | None = None) -> dict:
+    """Parse the slow changing fields of an anime detail page."""
+    nodes = (backend or get_backend()).detail_nodes(html, description=True)
+    return {"description": nodes.description}
+
+
+def parse_episodes(html: str) -> dict[int, int]:
+    """Return the id of every episode of an anime detail page, by number.
+
+    The ids are what the site expects when marking an episode seen.
+    """
+    spans = extract_spans(html)
+    if "episodes" not in spans:
+        raise AnimeFlvParseError("var episodes not found")
+    return episode_ids(html, *spans["episodes"])
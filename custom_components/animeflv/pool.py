@@ -0,0 +1,92 @@
+"""Clients of the AnimeFLV accounts configured, shared by the whole domain."""
+from __future__ import annotations
+
+import asyncio
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import slugify
+
+from .api import AnimeFlvApiClient
+from .cache import AnimeFlvDetailCache
+from .const import DOMAIN, STORAGE_VERSION
+
+DATA_CLIENT_POOL = f"{DOMAIN}_client_pool"
+
+
+class AnimeFlvClientPool:
+    """One client per account, all sharing the cache of public anime details.
+
+    Config entries and the config flow acquire the client of an account and
+    release it when done, the client is closed once nobody uses it. Its
+    session is stored by account, so logging in from the config flow is
+    not repeated when the entry is set up.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize."""
+        self._hass = hass
+        self.cache = AnimeFlvDetailCache(hass, f"{DOMAIN}.details")
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        self._clients: dict[str, AnimeFlvApiClient] = {}
+        self._users: dict[str, int] = {}
+
+    async def async_acquire(
+        self, username: str, password: str, **options
+    ) -> AnimeFlvApiClient:
+        """Return the client of username, options are used if it is created."""
+        account = username.lower()
+        async with self._lock:
+            await self._async_load()
+            if account not in self._clients:
+                self._clients[account] = AnimeFlvApiClient(
+                    username=username,
+                    password=password,
+                    hass=self._hass,
+                    cache=self.cache.for_account(account),
+                    session_store=self._session_store(account),
+                    **options,
+                )
+            self._users[account] = self._users.get(account, 0) + 1
+            return self._clients[account]
+
+    async def async_release(self, client: AnimeFlvApiClient) -> None:
+        """Stop using client, closing it if it was the last user."""
+        account = next(
+            (account for account, pooled in self._clients.items() if pooled is client),
+            None,
+        )
+        if account is None:
+            return
+        self._users[account] -= 1
+        if self._users[account] > 0:
+            return
+        del self._clients[account]
+        del self._users[account]
+        await client.async_close()
+
+    async def async_remove_account(self, username: str) -> None:
+        """Delete the stored session and what the cache knows of username."""
+        account = username.lower()
+        async with self._lock:
+            await self._async_load()
+            self.cache.remove_account(account)
+            await self._session_store(account).async_remove()
+
+    async def _async_load(self) -> None:
+        if not self._loaded:
+            await self.cache.async_load()
+            self._loaded = True
+
+    def _session_store(self, account: str) -> Store:
+        return Store(
+            self._hass, STORAGE_VERSION, f"{DOMAIN}.session.{slugify(account)}"
+        )
+
+
+def async_get_client_pool(hass: HomeAssistant) -> AnimeFlvClientPool:
+    """Return the client pool of the domain."""
+    if DATA_CLIENT_POOL not in hass.data:
+        hass.data[DATA_CLIENT_POOL] = AnimeFlvClientPool(hass)
+    return hass.data[DATA_CLIENT_POOL]
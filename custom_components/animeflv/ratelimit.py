@@ -0,0 +1,51 @@
+"""Rate limiting of the requests sent to AnimeFLV."""
+from __future__ import annotations
+
+import asyncio
+import time
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, RATE_LIMIT, RATE_LIMIT_BURST
+
+DATA_RATE_LIMITERS = f"{DOMAIN}_rate_limiters"
+
+
+class TokenBucket:
+    """Allow rate requests per second on average, in bursts of up to burst.
+
+    A rate of 0 or less disables the limit.
+    """
+
+    def __init__(self, rate: float = RATE_LIMIT, burst: int = RATE_LIMIT_BURST) -> None:
+        """Initialize."""
+        self._rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def async_acquire(self) -> None:
+        """Wait for a token, waiters are served in order."""
+        if self._rate <= 0:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self._burst, self._tokens + (now - self._updated) * self._rate
+            )
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self._rate)
+            self._tokens = 0
+            self._updated = time.monotonic()
+
+
+def async_get_rate_limiter(hass: HomeAssistant, host: str) -> TokenBucket:
+    """Return the limiter shared by every client of host."""
+    limiters: dict[str, TokenBucket] = hass.data.setdefault(DATA_RATE_LIMITERS, {})
+    if host not in limiters:
+        limiters[host] = TokenBucket()
+    return limiters[host]
@@ -0,0 +1,104 @@
+"""Backoff and circuit breaking for the requests to AnimeFLV."""
+from __future__ import annotations
+
+import random
+import time
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    CIRCUIT_COOLDOWN,
+    CIRCUIT_FAILURES,
+    DOMAIN,
+    LOGGER,
+    RETRY_BACKOFF,
+    RETRY_BACKOFF_MAX,
+)
+from .exceptions import AnimeFlvApiClientCommunicationError
+
+DATA_CIRCUIT_BREAKERS = f"{DOMAIN}_circuit_breakers"
+
+
+def backoff_delay(attempt: int) -> float:
+    """Return the seconds to wait before retrying attempt, with full jitter."""
+    return random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF * 2**attempt))
+
+
+class CircuitBreaker:
+    """Stop hammering the host after consecutive failures.
+
+    Once open, requests fail right away until the cooldown is over; then a
+    single request is let through and its outcome closes or reopens the
+    circuit, doubling the cooldown every time it reopens.
+    """
+
+    def __init__(
+        self,
+        failures: int = CIRCUIT_FAILURES,
+        cooldown: float = CIRCUIT_COOLDOWN,
+    ) -> None:
+        """Initialize."""
+        self._max_failures = failures
+        self._base_cooldown = cooldown
+        self._cooldown = cooldown
+        self._failures = 0
+        self._open_until: float | None = None
+        self._trial = False
+
+    @property
+    def is_open(self) -> bool:
+        """Return True while requests are refused."""
+        return self._open_until is not None and (
+            time.monotonic() < self._open_until or self._trial
+        )
+
+    def check(self) -> bool:
+        """Raise if a request may not be sent now.
+
+        Return True when the request is the trial of a circuit open until
+        now, its sender must then call end_trial once it is over.
+        """
+        if self._open_until is None:
+            return False
+        if self.is_open:
+            raise AnimeFlvApiClientCommunicationError(
+                "Too many errors, waiting before contacting AnimeFLV again",
+            )
+        self._trial = True
+        return True
+
+    def end_trial(self) -> None:
+        """Let another request through if the trial ended with no outcome.
+
+        A trial cancelled or failing with an error which says nothing about
+        the host would otherwise keep the circuit open for good.
+        """
+        self._trial = False
+
+    def record_success(self) -> None:
+        """Close the circuit."""
+        if self._open_until is not None:
+            LOGGER.info("AnimeFLV answers again")
+        self._failures = 0
+        self._open_until = None
+        self._trial = False
+        self._cooldown = self._base_cooldown
+
+    def record_failure(self) -> None:
+        """Count a failure, opening the circuit when there are too many."""
+        self._failures += 1
+        if self._trial:
+            self._trial = False
+            self._cooldown = min(self._cooldown * 2, 10 * self._base_cooldown)
+        elif self._failures < self._max_failures or self._open_until is not None:
+            return
+        LOGGER.warning("AnimeFLV keeps failing, pausing for %s seconds", self._cooldown)
+        self._open_until = time.monotonic() + self._cooldown
+
+
+def async_get_circuit_breaker(hass: HomeAssistant, host: str) -> CircuitBreaker:
+    """Return the circuit breaker shared by every client of host."""
+    breakers: dict[str, CircuitBreaker] = hass.data.setdefault(DATA_CIRCUIT_BREAKERS, {})
+    if host not in breakers:
+        breakers[host] = CircuitBreaker()
+    return breakers[host]
@@ -0,0 +1,55 @@
+"""When the detail page of an anime is worth fetching again.
+
+An airing anime is polled often on (and shortly after) the day its next
+episode is announced for, and left alone until then. AnimeFLV leaves stale
+dates on delayed animes, past the release window they are followed at the
+slower paces below. The progress of the user, only found in the detail
+page, is followed at a slower pace while there are episodes left to watch.
+Caught up, finished animes are checked once a day.
+"""
+from __future__ import annotations
+
+import datetime
+
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    REFRESH_IDLE,
+    REFRESH_PROGRESS,
+    REFRESH_RELEASE_DAY,
+    RELEASE_WINDOW,
+)
+
+
+def _release_time(next_episode: str | None) -> float | None:
+    """Return the timestamp of the midnight of the next episode date.
+
+    The midnight in the time zone of Home Assistant, not of the host.
+    """
+    if not next_episode:
+        return None
+    try:
+        return dt_util.start_of_local_day(
+            datetime.date.fromisoformat(next_episode)
+        ).timestamp()
+    except ValueError:
+        return None
+
+
+def next_refresh(detail: dict, fetched: float) -> float:
+    """Return the timestamp after which the detail fetched at fetched is stale."""
+    release = _release_time(detail.get("nextEpisode")) if detail["inEmission"] else None
+    if release is not None and release <= fetched:
+        if fetched < release + RELEASE_WINDOW.total_seconds():
+            return fetched + REFRESH_RELEASE_DAY.total_seconds()
+        # the date is stale, the episode is late
+        release = None
+
+    if detail["lastSeen"] < detail["episodesCount"]:
+        due = fetched + REFRESH_PROGRESS.total_seconds()
+    else:
+        due = fetched + REFRESH_IDLE.total_seconds()
+
+    if release is not None:
+        due = min(due, release)
+    return due
@@ -1,14 +1,35 @@
 """Sensor platform for animeflv."""
 from __future__ import annotations
 
+from collections.abc import Callable
+from dataclasses import dataclass
+
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.components.sensor import SensorEntity, SensorEntityDescription
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTime
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 
 from .const import DOMAIN
 from .coordinator import AnimeFlvDataUpdateCoordinator
 from .entity import AnimeFlvEntity
+from .metrics import RefreshMetrics
+
+ATTRIBUTES = (
+    "episodesCount",
+    "lastSeen",
+    "inEmission",
+    "nextEpisode",
+    "today",
+    "nextToWatch",
+    "title",
+)
 
 ENTITY_DESCRIPTIONS = (
     SensorEntityDescription(
@@ -19,6 +40,58 @@ ENTITY_DESCRIPTIONS = (
 )
 
 
+@dataclass(frozen=True, kw_only=True)
+class AnimeFlvMetricSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor reading the metrics of the last refresh."""
+
+    value_fn: Callable[[RefreshMetrics], float | int]
+    attributes_fn: Callable[[RefreshMetrics], dict] | None = None
+
+
+METRIC_DESCRIPTIONS = (
+    AnimeFlvMetricSensorEntityDescription(
+        key="refresh_duration",
+        name="Refresh duration",
+        icon="mdi:timer-outline",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=2,
+        value_fn=lambda metrics: round(metrics.duration, 3),
+        attributes_fn=lambda metrics: {
+            "phases": {name: round(value, 3) for name, value in metrics.phases.items()},
+            "slowest": {slug: round(value, 3) for slug, value in metrics.slowest()},
+        },
+    ),
+    AnimeFlvMetricSensorEntityDescription(
+        key="refresh_requests",
+        name="Refresh requests",
+        icon="mdi:swap-horizontal",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics: metrics.requests,
+        attributes_fn=lambda metrics: {"retries": metrics.retries},
+    ),
+    AnimeFlvMetricSensorEntityDescription(
+        key="refresh_bytes",
+        name="Refresh download",
+        icon="mdi:download",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        suggested_unit_of_measurement=UnitOfInformation.KIBIBYTES,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics: metrics.bytes,
+    ),
+    AnimeFlvMetricSensorEntityDescription(
+        key="refresh_cache_hits",
+        name="Refresh cache hits",
+        icon="mdi:cached",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics: metrics.cache_hits,
+        attributes_fn=lambda metrics: {"misses": metrics.cache_misses},
+    ),
+)
+
+
 async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry, async_add_entities):
     """Set up the sensor platform."""
     coordinator = hass.data[DOMAIN][config_entry.entry_id]
@@ -27,11 +100,29 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry, asyn
     for key in coordinator.data.keys():
         sensors.append(AnimeFlvSensor(coordinator=coordinator,animeKey=key))
 
+    sensors.extend(
+        AnimeFlvMetricSensor(coordinator=coordinator, entity_description=description)
+        for description in METRIC_DESCRIPTIONS
+    )
+    sensors.append(AnimeFlvAiringTodaySensor(coordinator=coordinator))
+
     async_add_entities(sensors)
 
     @callback
-    def async_add_sensor(info) -> None:
-        print(info)
+    def async_add_sensor(keys: set[str]) -> None:
+        async_add_entities(
+            AnimeFlvSensor(coordinator=coordinator, animeKey=key) for key in keys
+        )
+
+    @callback
+    def async_remove_sensor(keys: set[str]) -> None:
+        registry = er.async_get(hass)
+        for key in keys:
+            entity_id = registry.async_get_entity_id(
+                "sensor", DOMAIN, _unique_id(config_entry, key)
+            )
+            if entity_id is not None:
+                registry.async_remove(entity_id)
 
     config_entry.async_on_unload(
         async_dispatcher_connect(
@@ -40,45 +131,130 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry, asyn
             async_add_sensor,
         )
     )
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            f"{DOMAIN}_{config_entry.entry_id}_remove_{DOMAIN}",
+            async_remove_sensor,
+        )
+    )
+
+
+def _unique_id(config_entry: ConfigEntry, animeKey: str) -> str:
+    """Return the unique id of the sensor of an anime."""
+    sensorName = animeKey.lower().replace(" ", "")
+    return f"{DOMAIN}_{config_entry.title}_{sensorName}"
 
 
 class AnimeFlvSensor(AnimeFlvEntity, SensorEntity):
     """integration_blueprint Sensor class."""
 
+    # rarely changing, no need to store it in every state
+    _unrecorded_attributes = frozenset({"title"})
+
     def __init__(self, coordinator: AnimeFlvDataUpdateCoordinator, animeKey: str) -> None:
         """Initialize the sensor class."""
         self.anime = animeKey
         super().__init__(animeKey, coordinator)
+        self._update_from_data()
 
 
     @property
     def unique_id(self):
         """Return the ID of this device."""
-        sensorName = self.anime.lower().replace(" ", "")
-        return f"{DOMAIN}_{self.coordinator.config_entry.title}_{sensorName}"
+        return _unique_id(self.coordinator.config_entry, self.anime)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        self._update_from_data()
+        super()._handle_coordinator_update()
+
+    def _update_from_data(self) -> None:
+        """Read the value and attributes once per update of this anime."""
+        anime = self.coordinator.data.get(self.anime)
+        if anime is None:
+            self._attr_extra_state_attributes = None
+            return
+
+        if anime.progress is not None:
+            self._attr_native_value = anime.progress
+        self._attr_extra_state_attributes = {
+            attribute: getattr(anime, attribute) for attribute in ATTRIBUTES
+        }
+
+
+class AnimeFlvMetricSensor(AnimeFlvEntity, SensorEntity):
+    """Diagnostic sensor with a metric of the last refresh."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    entity_description: AnimeFlvMetricSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: AnimeFlvDataUpdateCoordinator,
+        entity_description: AnimeFlvMetricSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor class."""
+        super().__init__(None, coordinator)
+        self.entity_description = entity_description
+        self._attr_unique_id = (
+            f"{DOMAIN}_{coordinator.config_entry.title}_{entity_description.key}"
+        )
 
     @property
-    def native_value(self) -> str:
+    def native_value(self) -> float | int:
         """Return the native value of the sensor."""
-        if self.coordinator.data.get(self.anime).get("progress") is not None:
-            self._attr_native_value = self.coordinator.data.get(self.anime).get("progress")
-        return self._attr_native_value
+        return self.entity_description.value_fn(self.coordinator.client.metrics)
 
     @property
-    def extra_state_attributes(self):
+    def extra_state_attributes(self) -> dict | None:
         """Return the state attributes."""
-        if self.coordinator.data.get(self.anime) is None:
+        if self.entity_description.attributes_fn is None:
             return None
+        return self.entity_description.attributes_fn(self.coordinator.client.metrics)
+
+
+class AnimeFlvAiringTodaySensor(AnimeFlvEntity, SensorEntity):
+    """How many followed animes air today, with the whole index as attributes."""
+
+    _attr_icon = "mdi:television-classic"
+    _attr_name = "Airing today"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    # the lists are long and change with every episode seen
+    _unrecorded_attributes = frozenset({"this_week", "unwatched", "backlog"})
+
+    def __init__(self, coordinator: AnimeFlvDataUpdateCoordinator) -> None:
+        """Initialize the sensor class."""
+        super().__init__(None, coordinator)
+        self._attr_unique_id = f"{DOMAIN}_{coordinator.config_entry.title}_airing_today"
+        self._update_from_index()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        self._update_from_index()
+        super()._handle_coordinator_update()
+
+    def _update_from_index(self) -> None:
+        """Read the index the coordinator built in its last refresh."""
+        index = self.coordinator.index
+        animes = self.coordinator.data or {}
+
+        def entry(key: str) -> dict:
+            anime = animes[key]
+            return {
+                "slug": key,
+                "title": anime.title,
+                "nextEpisode": anime.nextEpisode,
+                "unwatched": anime.unwatched,
+                "nextToWatch": anime.nextToWatch,
+            }
 
-        attributes = {
-            "episodesCount": self.coordinator.data.get(self.anime).get("episodesCount"),
-            "lastSeen": self.coordinator.data.get(self.anime).get("lastSeen"),
-            "inEmission": self.coordinator.data.get(self.anime).get("inEmission"),
-            "nextEpisode": self.coordinator.data.get(self.anime).get("nextEpisode"),
-            "today": self.coordinator.data.get(self.anime).get("today"),
-            "nextToWatch": self.coordinator.data.get(self.anime).get("nextToWatch"),
-            "description": self.coordinator.data.get(self.anime).get("description"),
-            "cover": self.coordinator.data.get(self.anime).get("cover"),
-            "title": self.coordinator.data.get(self.anime).get("title"),
+        self._attr_native_value = len(index.airing_today)
+        self._attr_extra_state_attributes = {
+            "today": [entry(key) for key in index.airing_today],
+            "this_week": [entry(key) for key in index.airing_week],
+            "unwatched": len(index.unwatched),
+            "backlog": [entry(key) for key in index.backlog],
         }
-        return attributes
\ No newline at end of file
@@ -0,0 +1,150 @@
+"""Services of the animeflv integration."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+import voluptuous as vol
+
+from .const import DOMAIN
+from .coordinator import AnimeFlvDataUpdateCoordinator, coordinator_following
+from .exceptions import AnimeFlvApiClientError
+
+SERVICE_GET_INFO = "get_info"
+SERVICE_MARK_WATCHED = "mark_watched"
+SERVICE_REFRESH_ANIME = "refresh_anime"
+ATTR_ANIME = "anime"
+ATTR_FIRST_EPISODE = "first_episode"
+ATTR_LAST_EPISODE = "last_episode"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+
+GET_INFO_SCHEMA = vol.Schema(
+    {vol.Required(ATTR_ANIME): vol.All(cv.ensure_list, [cv.string])}
+)
+MARK_WATCHED_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ANIME): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_FIRST_EPISODE): cv.positive_int,
+        vol.Optional(ATTR_LAST_EPISODE): cv.positive_int,
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+REFRESH_ANIME_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ANIME): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services, once for every config entry."""
+    if hass.services.has_service(DOMAIN, SERVICE_GET_INFO):
+        return
+
+    async def async_get_info(call: ServiceCall) -> ServiceResponse:
+        """Return the title, cover and description of followed animes."""
+        response = {}
+        for key in call.data[ATTR_ANIME]:
+            coordinator = coordinator_following(hass, key)
+            if coordinator is None:
+                raise HomeAssistantError(f"{key} is not followed by any account")
+            anime = coordinator.data[key]
+            try:
+                info = await coordinator.client.async_get_info(key)
+            except AnimeFlvApiClientError as exception:
+                raise HomeAssistantError(
+                    f"Error fetching the description of {key}: {exception}"
+                ) from exception
+            response[key] = {"title": anime.title, "cover": anime.cover, **info}
+        return response
+
+    async def async_mark_watched(call: ServiceCall) -> None:
+        """Mark episodes of followed animes seen, by every account following them.
+
+        Only the account of config_entry_id when given.
+        """
+        span = (call.data.get(ATTR_FIRST_EPISODE), call.data.get(ATTR_LAST_EPISODE))
+        await _async_run_by_account(
+            hass,
+            call,
+            "marking episodes seen",
+            lambda coordinator, keys: coordinator.async_mark_watched(
+                {key: span for key in keys}
+            ),
+        )
+
+    async def async_refresh_anime(call: ServiceCall) -> None:
+        """Read the detail pages of followed animes again, without a full refresh."""
+        await _async_run_by_account(
+            hass,
+            call,
+            "refreshing",
+            lambda coordinator, keys: coordinator.async_refresh_animes(keys),
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_INFO,
+        async_get_info,
+        schema=GET_INFO_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_MARK_WATCHED,
+        async_mark_watched,
+        schema=MARK_WATCHED_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REFRESH_ANIME,
+        async_refresh_anime,
+        schema=REFRESH_ANIME_SCHEMA,
+    )
+
+
+async def _async_run_by_account(
+    hass: HomeAssistant,
+    call: ServiceCall,
+    what: str,
+    action: Callable[[AnimeFlvDataUpdateCoordinator, list[str]], Awaitable],
+) -> None:
+    """Run action once per account, with the animes of the call it follows.
+
+    Every account following an anime is used, or only the account of
+    config_entry_id when the call has one.
+    """
+    batches = {}
+    for entry_id, coordinator in hass.data.get(DOMAIN, {}).items():
+        if call.data.get(ATTR_CONFIG_ENTRY_ID, entry_id) != entry_id:
+            continue
+        if coordinator.data is None:
+            continue
+        keys = [key for key in call.data[ATTR_ANIME] if key in coordinator.data]
+        if keys:
+            batches[coordinator] = keys
+    unknown = set(call.data[ATTR_ANIME]).difference(*batches.values())
+    if unknown:
+        raise HomeAssistantError(
+            f"{', '.join(sorted(unknown))} not followed by the account"
+        )
+    results = await asyncio.gather(
+        *(action(coordinator, keys) for coordinator, keys in batches.items()),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, AnimeFlvApiClientError):
+            raise HomeAssistantError(f"Error {what}: {result}") from result
+        if isinstance(result, Exception):
+            raise result
@@ -0,0 +1,368 @@
+"""HTTP transports used by the AnimeFLV client."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from functools import partial
+import importlib.util
+import socket
+import time
+
+import aiohttp
+import async_timeout
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from yarl import URL
+
+from .const import ANIMEFLV_HOST, CHALLENGE_COOLDOWN, LOGGER, REQUEST_TIMEOUT
+from .exceptions import AnimeFlvApiClientCommunicationError, AnimeFlvApiClientError
+
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Android 13; Mobile; rv:121.0) Gecko/121.0 Firefox/121.0"
+)
+
+
+def _accept_encoding() -> str:
+    """Return the encodings aiohttp can decode, brotli when it is installed."""
+    for module in ("brotlicffi", "brotli"):
+        if importlib.util.find_spec(module) is not None:
+            return "gzip, deflate, br"
+    return "gzip, deflate"
+
+
+ACCEPT_ENCODING = _accept_encoding()
+
+
+def _create_scraper():
+    """Return a new cloudscraper session, run in the executor.
+
+    cloudscraper and requests are slow to import and only needed once
+    Cloudflare challenges us, so they are imported here on first use
+    rather than when the integration is loaded.
+    """
+    import cloudscraper  # pylint: disable=import-outside-toplevel
+
+    return cloudscraper.create_scraper(
+        {
+                'browser': 'firefox',
+                'platform': 'android',
+                #'mobile': False
+                'desktop' : False
+        }
+    )
+
+
+@dataclass
+class AnimeFlvResponse:
+    """A fully read HTTP response, whatever transport produced it."""
+
+    status_code: int
+    text: str
+    url: str
+    redirected: bool = False
+    headers: dict = field(default_factory=dict)
+    # bytes of the body as received
+    size: int = 0
+    # the body itself, only kept by async_get_binary
+    content: bytes = b""
+
+    @property
+    def is_challenge(self) -> bool:
+        """Return True when Cloudflare answered with a browser challenge."""
+        if self.status_code not in (403, 429, 503):
+            return False
+        if self.headers.get("cf-mitigated") == "challenge":
+            return True
+        return "challenge-platform" in self.text or "Just a moment..." in self.text
+
+    @property
+    def not_modified(self) -> bool:
+        """Return True when a conditional request found nothing new."""
+        return self.status_code == 304
+
+    @property
+    def validators(self) -> dict:
+        """Return the ETag and Last-Modified to make the next request conditional."""
+        return {
+            key: self.headers[key]
+            for key in ("etag", "last-modified")
+            if key in self.headers
+        }
+
+
+class AnimeFlvTransport:
+    """Interface of the transports, all methods are called from the event loop."""
+
+    async def async_get(self, url: str, headers: dict | None = None) -> AnimeFlvResponse:
+        """Get url, with extra headers such as If-None-Match."""
+        raise NotImplementedError
+
+    async def async_post(self, url: str, data: dict) -> AnimeFlvResponse:
+        """Post a form to url."""
+        raise NotImplementedError
+
+    async def async_get_binary(self, url: str) -> AnimeFlvResponse:
+        """Get url keeping the body as bytes, text is only decoded for text/*."""
+        raise NotImplementedError
+
+    def get_state(self) -> dict:
+        """Return the user agent and cookies of the session."""
+        raise NotImplementedError
+
+    def set_state(self, state: dict) -> None:
+        """Restore a state returned by get_state."""
+        raise NotImplementedError
+
+    async def async_close(self) -> None:
+        """Close the session, the transport is not used afterwards."""
+
+
+class AiohttpTransport(AnimeFlvTransport):
+    """Native async transport on top of the connection pool of Home Assistant."""
+
+    def __init__(self, hass: HomeAssistant, host: str = ANIMEFLV_HOST) -> None:
+        """Initialize."""
+        self._hass = hass
+        self._host = URL(host)
+        self._user_agent = DEFAULT_USER_AGENT
+        self._session: aiohttp.ClientSession | None = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Return the client session, sharing the connector of Home Assistant."""
+        if self._session is None:
+            # own cookie jar so every account keeps its own login, detached
+            # by async_close
+            self._session = async_create_clientsession(
+                self._hass, auto_cleanup=False, cookie_jar=aiohttp.CookieJar()
+            )
+        return self._session
+
+    async def async_get(self, url: str, headers: dict | None = None) -> AnimeFlvResponse:
+        """Get url, with extra headers such as If-None-Match."""
+        return await self._request("get", url, headers=headers)
+
+    async def async_post(self, url: str, data: dict) -> AnimeFlvResponse:
+        """Post a form to url."""
+        return await self._request("post", url, data)
+
+    async def async_get_binary(self, url: str) -> AnimeFlvResponse:
+        """Get url keeping the body as bytes, text is only decoded for text/*."""
+        return await self._request("get", url, binary=True)
+
+    def get_state(self) -> dict:
+        """Return the user agent and cookies of the session."""
+        cookies = self.session.cookie_jar.filter_cookies(self._host)
+        return {
+            "user_agent": self._user_agent,
+            "cookies": {key: morsel.value for key, morsel in cookies.items()},
+        }
+
+    def set_state(self, state: dict) -> None:
+        """Restore a state returned by get_state."""
+        if state.get("user_agent"):
+            self._user_agent = state["user_agent"]
+        self.session.cookie_jar.update_cookies(state["cookies"], self._host)
+
+    async def async_close(self) -> None:
+        """Close the session, the transport is not used afterwards."""
+        if self._session is not None:
+            # the connector belongs to Home Assistant, only let go of it
+            self._session.detach()
+            self._session = None
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        data: dict | None = None,
+        binary: bool = False,
+        headers: dict | None = None,
+    ) -> AnimeFlvResponse:
+        try:
+            async with async_timeout.timeout(REQUEST_TIMEOUT):
+                response = await self.session.request(
+                    method=method,
+                    url=url,
+                    headers={
+                        "User-Agent": self._user_agent,
+                        "Accept-Encoding": ACCEPT_ENCODING,
+                        **(headers or {}),
+                    },
+                    data=data,
+                )
+                body = await response.read()
+                text = ""
+                if not binary or response.content_type.startswith("text/"):
+                    text = await response.text()
+                return AnimeFlvResponse(
+                    status_code=response.status,
+                    text=text,
+                    size=len(body),
+                    url=str(response.url),
+                    redirected=bool(response.history),
+                    headers={key.lower(): value for key, value in response.headers.items()},
+                    content=body if binary else b"",
+                )
+
+        except asyncio.TimeoutError as exception:
+            raise AnimeFlvApiClientCommunicationError(
+                "Timeout error fetching information",
+            ) from exception
+        except (aiohttp.ClientError, socket.gaierror) as exception:
+            raise AnimeFlvApiClientCommunicationError(
+                "Error fetching information",
+            ) from exception
+
+
+class CloudscraperTransport(AnimeFlvTransport):
+    """Blocking cloudscraper session run in the executor, solves challenges."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize."""
+        self._hass = hass
+        self._session = None
+
+    async def _getSession(self) -> any:
+        if self._session is None:
+            self._session = await self._hass.async_add_executor_job(_create_scraper)
+
+        return self._session
+
+    async def async_get(self, url: str, headers: dict | None = None) -> AnimeFlvResponse:
+        """Get url, with extra headers such as If-None-Match."""
+        session = await self._getSession()
+        # cloudscraper negotiates the encodings itself, as the browser it mimics
+        return await self._request(
+            partial(session.get, url, headers=headers, timeout=REQUEST_TIMEOUT)
+        )
+
+    async def async_post(self, url: str, data: dict) -> AnimeFlvResponse:
+        """Post a form to url."""
+        session = await self._getSession()
+        return await self._request(
+            partial(session.post, url, data, timeout=REQUEST_TIMEOUT)
+        )
+
+    async def async_get_binary(self, url: str) -> AnimeFlvResponse:
+        """Get url keeping the body as bytes, text is only decoded for text/*."""
+        session = await self._getSession()
+        return await self._request(
+            partial(session.get, url, timeout=REQUEST_TIMEOUT), binary=True
+        )
+
+    def get_state(self) -> dict:
+        """Return the user agent and cookies of the session."""
+        if self._session is None:
+            return {"user_agent": None, "cookies": {}}
+        return {
+            "user_agent": self._session.headers.get("User-Agent"),
+            "cookies": self._session.cookies.get_dict(),
+        }
+
+    def set_state(self, state: dict) -> None:
+        """Restore a state returned by get_state.
+
+        The session must exist already, see async_prepare.
+        """
+        if state.get("user_agent"):
+            self._session.headers["User-Agent"] = state["user_agent"]
+        self._session.cookies.update(state["cookies"])
+
+    async def async_prepare(self) -> None:
+        """Create the scraper session."""
+        await self._getSession()
+
+    async def async_close(self) -> None:
+        """Close the session, the transport is not used afterwards."""
+        if self._session is not None:
+            await self._hass.async_add_executor_job(self._session.close)
+            self._session = None
+
+    async def _request(self, func, binary: bool = False) -> AnimeFlvResponse:
+        try:
+            response = await self._hass.async_add_executor_job(func)
+        except Exception as exception:  # pylint: disable=broad-except
+            # already imported by cloudscraper, see _create_scraper
+            import requests  # pylint: disable=import-outside-toplevel
+
+            if isinstance(exception, requests.RequestException):
+                raise AnimeFlvApiClientCommunicationError(
+                    "Error fetching information",
+                ) from exception
+            raise AnimeFlvApiClientError(
+                "Something really wrong happened!"
+            ) from exception
+        headers = {key.lower(): value for key, value in response.headers.items()}
+        text = ""
+        if not binary or headers.get("content-type", "").startswith("text/"):
+            text = response.text
+        return AnimeFlvResponse(
+            status_code=response.status_code,
+            text=text,
+            size=len(response.content),
+            url=response.url,
+            redirected=bool(response.history),
+            headers=headers,
+            content=response.content if binary else b"",
+        )
+
+
+class ChallengeFallbackTransport(AnimeFlvTransport):
+    """Use aiohttp, falling back to cloudscraper when Cloudflare challenges us.
+
+    The clearance cookie and user agent obtained by cloudscraper are handed
+    back to aiohttp, so usually a single request goes through the executor.
+    When the challenge comes back right away the fallback is kept for
+    CHALLENGE_COOLDOWN seconds.
+    """
+
+    def __init__(self, hass: HomeAssistant, host: str = ANIMEFLV_HOST) -> None:
+        """Initialize."""
+        self._primary = AiohttpTransport(hass, host)
+        self._fallback = CloudscraperTransport(hass)
+        self._last_challenge = float("-inf")
+        self._fallback_until = 0.0
+
+    async def async_get(self, url: str, headers: dict | None = None) -> AnimeFlvResponse:
+        """Get url, with extra headers such as If-None-Match."""
+        return await self._request("async_get", url, headers)
+
+    async def async_post(self, url: str, data: dict) -> AnimeFlvResponse:
+        """Post a form to url."""
+        return await self._request("async_post", url, data)
+
+    async def async_get_binary(self, url: str) -> AnimeFlvResponse:
+        """Get url keeping the body as bytes, text is only decoded for text/*."""
+        return await self._request("async_get_binary", url)
+
+    def get_state(self) -> dict:
+        """Return the user agent and cookies of the session."""
+        return self._primary.get_state()
+
+    def set_state(self, state: dict) -> None:
+        """Restore a state returned by get_state."""
+        self._primary.set_state(state)
+
+    async def async_close(self) -> None:
+        """Close the session, the transport is not used afterwards."""
+        await self._primary.async_close()
+        await self._fallback.async_close()
+
+    async def _request(self, method: str, *args) -> AnimeFlvResponse:
+        now = time.monotonic()
+        if now >= self._fallback_until:
+            response = await getattr(self._primary, method)(*args)
+            if not response.is_challenge:
+                return response
+            if now - self._last_challenge < CHALLENGE_COOLDOWN:
+                LOGGER.debug("Challenged again, using cloudscraper for a while")
+                self._fallback_until = now + CHALLENGE_COOLDOWN
+            self._last_challenge = now
+
+        await self._fallback.async_prepare()
+        # keep the user agent cloudscraper picked, it must match its TLS setup
+        self._fallback.set_state({"cookies": self._primary.get_state()["cookies"]})
+        response = await getattr(self._fallback, method)(*args)
+        self._primary.set_state(self._fallback.get_state())
+        return response
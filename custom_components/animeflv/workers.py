@@ -0,0 +1,134 @@
+"""Worker threads parsing the pages fetched by the AnimeFLV clients.
+
+Parsing hundreds of detail pages takes seconds of CPU, which would block
+the event loop if done there. The clients hand the HTML to the pool and
+go on fetching while it is parsed, only the small parsed records come
+back to the loop.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import time
+from typing import Any
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant, callback
+
+from .const import DOMAIN, PARSE_BATCH_SIZE, PARSE_WORKERS
+
+DATA_PARSE_POOL = f"{DOMAIN}_parse_pool"
+
+
+def _parse_batch(
+    jobs: list[tuple[Callable, str]],
+) -> list[tuple[Any, BaseException | None, float]]:
+    """Run the parse jobs of a batch, in a worker thread.
+
+    Every job gives its result or its exception, and the CPU time it took.
+    """
+    results = []
+    for parse, html in jobs:
+        start = time.thread_time()
+        try:
+            result, error = parse(html), None
+        except Exception as exception:  # pylint: disable=broad-except
+            result, error = None, exception
+        results.append((result, error, time.thread_time() - start))
+    return results
+
+
+class ParseWorkerPool:
+    """Parse pages in worker threads, in batches, away from the event loop.
+
+    A batch is handed to a worker as soon as one is idle, so pages waiting
+    while every worker is busy are sent together in the next batch, up to
+    batch_size pages. Threads are used rather than processes, the parsers
+    release the GIL for most of their work (selectolax, lxml) and processes
+    would have to copy every page and be forked from Home Assistant.
+    """
+
+    def __init__(
+        self, workers: int = PARSE_WORKERS, batch_size: int = PARSE_BATCH_SIZE
+    ) -> None:
+        """Initialize."""
+        self._workers = max(1, workers)
+        self._batch_size = max(1, batch_size)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self._workers, thread_name_prefix=f"{DOMAIN}_parse"
+        )
+        self._pending: list[tuple[Callable, str, asyncio.Future]] = []
+        self._running = 0
+        self._closed = False
+
+    async def async_parse(self, parse: Callable[[str], Any], html: str) -> tuple[Any, float]:
+        """Return what parse makes of html and the CPU time it took.
+
+        The exceptions of parse are raised here, as if it was called directly.
+        """
+        if self._closed:
+            raise RuntimeError("The parse workers are stopped")
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((parse, html, future))
+        self._dispatch()
+        return await future
+
+    def shutdown(self) -> None:
+        """Stop the workers, the pages not parsed yet are dropped."""
+        self._closed = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for _, _, future in self._pending:
+            future.cancel()
+        self._pending = []
+
+    def _dispatch(self) -> None:
+        if self._closed:
+            return
+        loop = asyncio.get_running_loop()
+        while self._pending and self._running < self._workers:
+            batch = self._pending[: self._batch_size]
+            del self._pending[: self._batch_size]
+            self._running += 1
+            job = loop.run_in_executor(
+                self._executor,
+                _parse_batch,
+                [(parse, html) for parse, html, _ in batch],
+            )
+            job.add_done_callback(partial(self._batch_done, batch))
+
+    def _batch_done(self, batch: list, job: asyncio.Future) -> None:
+        self._running -= 1
+        if job.cancelled():
+            # the workers were shut down
+            for _, _, future in batch:
+                future.cancel()
+            return
+        if job.exception() is not None:
+            results = [(None, job.exception(), 0.0)] * len(batch)
+        else:
+            results = job.result()
+        for (_, _, future), (result, error, seconds) in zip(batch, results):
+            if future.done():
+                # the refresh waiting for it was cancelled
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result((result, seconds))
+        self._dispatch()
+
+
+@callback
+def async_get_parse_pool(hass: HomeAssistant) -> ParseWorkerPool:
+    """Return the parse pool shared by every client, stopped with Home Assistant."""
+    if DATA_PARSE_POOL not in hass.data:
+        hass.data[DATA_PARSE_POOL] = pool = ParseWorkerPool()
+
+        @callback
+        def async_shutdown(event: Event) -> None:
+            pool.shutdown()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, async_shutdown)
+    return hass.data[DATA_PARSE_POOL]